@@ -0,0 +1,37 @@
+# Benchmark: cost of the video effects pipeline on the window and on the board surface.
+# Run from the repository root: python -m benchmarks.effects
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from constants import *
+from video.effects import ColourShiftEffect, ScanlineEffect, apply_effects
+
+import pygame
+import timeit
+
+
+def measure(surface: pygame.Surface, effects, number: int = 50) -> float:
+    def frame():
+        for effect in effects:
+            effect.update(1000 / FPS)
+        apply_effects(surface, effects)
+    return min(timeit.repeat(frame, number=number, repeat=5)) / number
+
+
+def main():
+    pygame.display.init()
+    display = pygame.display.set_mode(WINDOW_SIZE)
+    board = pygame.Surface(BOARD_SIZE).convert()
+    budget = 1.0 / FPS
+
+    for name, surface in (("window", display), ("board", board)):
+        surface.fill((100, 50, 200))
+        for label, effects in (("ColourShiftEffect", [ColourShiftEffect()]),
+                               ("ScanlineEffect", [ScanlineEffect(speed=240)]),
+                               ("both", [ColourShiftEffect(), ScanlineEffect(speed=240)])):
+            cost = measure(surface, effects)
+            print(f"{name:6} {label:17} {cost * 1000:6.2f} ms ({cost / budget:5.1%} of a {FPS} FPS frame)")
+
+
+if __name__ == "__main__":
+    main()
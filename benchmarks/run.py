@@ -0,0 +1,253 @@
+# Benchmark suite for the simulation, rendering, audio and maths hot paths.
+# Run from the repository root:
+#   python -m benchmarks.run --output results.json
+#   python -m benchmarks.run --compare baseline.json   # exits with 1 if anything regressed
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from components import Board, Direction
+from constants import *
+from maths import Vec2, Vector
+
+from typing import Callable
+import argparse
+import datetime
+import json
+import platform
+import sys
+import timeit
+
+
+Benchmark = Callable[[], Callable[[], object]] # Setup, returning the function to time
+
+
+def measure(function: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> float:
+    # Best seconds per call. The number of calls per repeat is scaled so each repeat takes at least min_time.
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+# === Simulation ===
+
+def board_steps(board: Board) -> Callable[[], object]:
+    directions = [Direction.LEFT] * 60 + [Direction.RIGHT] * 60
+    state = board.snapshot()
+    counter = [0]
+
+    def step():
+        counter[0] += 1
+        if counter[0] % 10_000 == 0:
+            board.restore(state) # Keep the board in the same phase of the game
+        return board.update(directions[counter[0] % len(directions)], 1.0 / FPS)
+    return step
+
+
+def board_update_fresh():
+    return board_steps(Board(BOARD_SIZE, COLUMS_ROWS, seed=0))
+
+
+def board_update_late():
+    board = Board(BOARD_SIZE, COLUMS_ROWS, seed=0)
+    for block in list(board.blocks)[:-3]: # Late in a level, only a few blocks left
+        board.blocks.remove(block)
+    return board_steps(board)
+
+
+def board_update_swept():
+    return board_steps(Board(BOARD_SIZE, COLUMS_ROWS, swept=True, seed=0))
+
+
+# === Rendering ===
+
+_game = None
+
+def game():
+    global _game
+    if _game is None:
+        from game import Game
+        _game = Game(seed=0)
+    return _game
+
+
+def draw_board_full():
+    current = game()
+    def draw():
+        current.full_redraw = True
+        current.draw_board()
+    return draw
+
+
+def draw_board_dirty():
+    current = game()
+    current.full_redraw = True
+    current.draw_board()
+    current.full_redraw = False
+    def draw():
+        current.board.update(Direction.LEFT, 1.0 / FPS)
+        current.draw_board()
+    return draw
+
+
+def draw_score_changed():
+    current = game()
+    def draw():
+        current.board.score += 1
+        current.draw_score()
+    return draw
+
+
+def draw_score_cached():
+    current = game()
+    current.full_redraw = False
+    current.draw_score()
+    return current.draw_score
+
+
+# === Audio ===
+
+def sound_generate(wave_name: str) -> Benchmark:
+    def setup():
+        from sound import waves
+        from sound.sound import Sound
+        game() # Initialises the mixer
+        sound = Sound(440, 0.5, getattr(waves, wave_name))
+        return sound.generate
+    return setup
+
+
+# === Maths ===
+
+def vector_add():
+    a, b = Vector(1.0, 2.0), Vector(3.0, 4.0)
+    return lambda: a + b
+
+
+def vector_scale():
+    a = Vector(1.0, 2.0)
+    return lambda: a * 0.5
+
+
+def vector_dot():
+    a, b = Vector(1.0, 2.0), Vector(3.0, 4.0)
+    return lambda: a * b
+
+
+def vector_index():
+    a = Vector(1.0, 2.0)
+    return lambda: a[0]
+
+
+def vec2_add_scaled():
+    a, b = Vec2(1.0, 2.0), Vec2(3.0, 4.0)
+    return lambda: a.add_scaled(b, 0.0)
+
+
+# === Effects ===
+
+def effect_apply(effect_name: str) -> Benchmark:
+    def setup():
+        from video import effects
+        display = game().display
+        effect = getattr(effects, effect_name)()
+        def apply():
+            effect.update(1000 / FPS)
+            effect.apply(display)
+        return apply
+    return setup
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "board.update.fresh": board_update_fresh,
+    "board.update.late": board_update_late,
+    "board.update.swept": board_update_swept,
+    "game.draw_board.full": draw_board_full,
+    "game.draw_board.dirty": draw_board_dirty,
+    "game.draw_score.changed": draw_score_changed,
+    "game.draw_score.cached": draw_score_cached,
+    **{f"sound.generate.{wave}": sound_generate(wave) for wave in ("sine", "square", "sawtooth", "triangle", "noise")},
+    "maths.vector.add": vector_add,
+    "maths.vector.scale": vector_scale,
+    "maths.vector.dot": vector_dot,
+    "maths.vector.index": vector_index,
+    "maths.vec2.add_scaled": vec2_add_scaled,
+    **{f"effects.{effect}.apply": effect_apply(effect) for effect in ("ColourShiftEffect", "ScanlineEffect")},
+}
+
+
+def run(names: list[str], min_time: float) -> dict[str, float]:
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](), min_time)
+        print(f"{name:32} {format_time(results[name])}", file=sys.stderr)
+    return results
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    # Prints a comparison table and returns the names of benchmarks that got slower by more than `threshold`
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:32} {format_time(seconds)}   (new)")
+            continue
+        change = seconds / baseline[name] - 1.0
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "faster"
+        print(f"{name:32} {format_time(baseline[name])} -> {format_time(seconds)} {change:+7.1%} {flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Breakout benchmark suite. All results are seconds per operation.")
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a stored baseline JSON and flag regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing repeat")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    results = run(names, args.min_time)
+    report = {
+        "meta": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "unit": "seconds per operation",
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,51 @@
+# Micro-benchmark: maths.Vector vs maths.Vec2 on the operations the physics step performs every frame.
+# Run from the repository root: python -m benchmarks.vector
+from components import Board, Direction
+from maths import Vec2, Vector
+
+import timeit
+
+
+DELTA_TIME: float = 1.0 / 60
+
+
+def vector_step():
+    position = Vector(400.0, 900.0)
+    velocity = Vector(5.0, -40.0)
+    # Ball.update, a bounce and a push out of the wall, the way they used to be written
+    position = position + velocity * DELTA_TIME
+    velocity = Vector(velocity[0], -min(55.0, abs(velocity[1])) * (1 if velocity[1] > 0 else -1))
+    position = Vector(position[0], 10.0)
+
+
+def vec2_step():
+    position = Vec2(400.0, 900.0)
+    velocity = Vec2(5.0, -40.0)
+    position.add_scaled(velocity, DELTA_TIME)
+    velocity.y = -min(55.0, abs(velocity.y)) * (1 if velocity.y > 0 else -1)
+    position.y = 10.0
+
+
+def board_steps(board: Board, steps: int):
+    for i in range(steps):
+        board.update(Direction.LEFT if i % 120 < 60 else Direction.RIGHT, DELTA_TIME)
+
+
+def measure(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number
+
+
+def main():
+    number = 200_000
+    vector_time = measure(vector_step, number)
+    vec2_time = measure(vec2_step, number)
+    print(f"Vector step: {vector_time * 1e9:8.1f} ns")
+    print(f"Vec2 step:   {vec2_time * 1e9:8.1f} ns ({vector_time / vec2_time:.2f}x faster)")
+
+    steps = 20_000
+    board_time = measure(lambda: board_steps(Board((800, 1000)), steps), 1) / steps
+    print(f"Board.update: {board_time * 1e6:7.2f} us/step ({1 / board_time:,.0f} steps/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 from colours import *
 from constants import *
-from maths import Vector
+from maths import Vec2, Vector
 
+from typing import NamedTuple
+import array
 import enum
+import math
 import random
 
 
@@ -15,38 +18,231 @@ vector_g: Vector[float] = Vector(0.0, g)
 
 class Block:
     colour: tuple[int, int, int]
-    position: Vector[float]
+    position: Vec2
     size: float
 
-    def __init__(self, position: Vector[float], size: float, colour: tuple[int, int, int]):
+    index: int
+
+    def __init__(self, position: Vec2, size: float, colour: tuple[int, int, int], index: int = -1):
         self.position = position # Top left
         self.size = size
         self.colour = colour
+        self.index = index # Cell in the owning BlockGrid, row-major
+
+
+class BlockGrid:
+    # Blocks stored by (column, row) cell. Collision queries only look at the cells the ball overlaps
+    # and removing a block just clears its cell. Iterating yields the remaining blocks in row-major order.
+    blocks: list[Block] # Every cell, alive or not
+    alive: bytearray
+    count: int
+    initial: bytes # Alive cells at the start of the level
+    initial_count: int
+    revision: int # Bumped whenever many cells change at once (reset, restore)
+
+    number_blocks: tuple[int, int]
+    block_size: float
+    top_space: int
+
+    def __init__(self, number_blocks: tuple[int, int], block_size: float, top_space: int, block_colours: list[tuple[int, int, int]], layout: bytes | None = None):
+        # Without a layout every cell holds a block, coloured by row. A layout has one byte per cell (row-major):
+        # 0 for an empty cell, otherwise the index into `block_colours` plus one.
+        self.number_blocks = number_blocks
+        self.block_size = block_size
+        self.top_space = top_space
+
+        self.blocks = []
+        for y in range(number_blocks[1]):
+            for x in range(number_blocks[0]):
+                if layout is None:
+                    colour = block_colours[y % len(block_colours)]
+                else:
+                    cell = layout[len(self.blocks)]
+                    colour = block_colours[cell - 1] if cell else BLACK
+                self.blocks.append(Block(Vec2(x * block_size, (y + top_space) * block_size), block_size, colour, len(self.blocks)))
+
+        self.initial = b"\x01" * len(self.blocks) if layout is None else bytes(1 if cell else 0 for cell in layout)
+        self.initial_count = self.initial.count(1)
+        self.alive = bytearray(self.initial)
+        self.count = self.initial_count
+        self.revision = 0
+
+    def __iter__(self):
+        return (block for block, alive in zip(self.blocks, self.alive) if alive)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __getitem__(self, cell: tuple[int, int]) -> Block | None:
+        index = cell[1] * self.number_blocks[0] + cell[0]
+        return self.blocks[index] if self.alive[index] else None
+
+    def remove(self, block: Block):
+        if not self.alive[block.index]:
+            raise ValueError("BlockGrid.remove(block): block not in grid")
+        self.alive[block.index] = 0
+        self.count -= 1
+
+    def reset(self):
+        self.alive[:] = self.initial
+        self.count = self.initial_count
+        self.revision += 1
+
+    def restore(self, alive: bytes, count: int):
+        self.alive[:] = alive
+        self.count = count
+        self.revision += 1
+
+    def query(self, left: float, top: float, right: float, bottom: float):
+        # Remaining blocks (in row-major order) overlapping the closed rectangle, looking only at the cells it covers.
+        # One extra cell before the range catches edges touching exactly on a cell boundary.
+        columns, rows = self.number_blocks
+        first_column = max(int(math.floor(left / self.block_size)) - 1, 0)
+        last_column = min(int(math.floor(right / self.block_size)), columns - 1)
+        first_row = max(int(math.floor(top / self.block_size)) - 1 - self.top_space, 0)
+        last_row = min(int(math.floor(bottom / self.block_size)) - self.top_space, rows - 1)
+
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                index = row * columns + column
+                if not self.alive[index]:
+                    continue
+                block = self.blocks[index]
+                if (right >= block.position.x and
+                    left <= block.position.x + block.size and
+                    bottom >= block.position.y and
+                    top <= block.position.y + block.size):
+                    yield block
+
+    def collide(self, x: float, y: float, radius: float) -> Block | None:
+        # First block whose AABB overlaps the ball's AABB.
+        # Not exact for a circle, but good enough and much faster than a circle-rectangle collision check.
+        return next(self.query(x - radius, y - radius, x + radius, y + radius), None)
+
+
+def ray_box(x: float, y: float, velocity_x: float, velocity_y: float, left: float, top: float, right: float, bottom: float) -> tuple[float, float, int]:
+    # Slab test of the ray (x, y) + t * velocity against a box.
+    # Returns the entry time, exit time and the axis (0 = x, 1 = y) the ray entered through last.
+    t_enter = -math.inf
+    t_exit = math.inf
+    axis = -1
+    for position, velocity, low, high, slab in ((x, velocity_x, left, right, 0), (y, velocity_y, top, bottom, 1)):
+        if velocity == 0:
+            if position < low or position > high:
+                return math.inf, -math.inf, -1
+            continue
+        t_low = (low - position) / velocity
+        t_high = (high - position) / velocity
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        if t_low > t_enter:
+            t_enter = t_low
+            axis = slab
+        if t_high < t_exit:
+            t_exit = t_high
+    return t_enter, t_exit, axis
+
+
+def unfold(position: float, velocity: float, low: float, high: float, duration: float, max_velocity: float) -> tuple[float, float]:
+    # Position and velocity after `duration` along one axis bouncing between `low` and `high`, in closed form.
+    # Like Ball.bounce_x, the first bounce limits the speed to `max_velocity`.
+    if velocity == 0:
+        return position, velocity
+    first = max(((high if velocity > 0 else low) - position) / velocity, 0.0)
+    if first >= duration:
+        return position + velocity * duration, velocity
+    speed = min(max_velocity, abs(velocity))
+    span = high - low
+    if span <= 0:
+        return low, -math.copysign(speed, velocity)
+    # Unfold the bounces into one straight line and fold the distance back into the span
+    distance = speed * (duration - first)
+    bounces = int(distance // span)
+    offset = distance - bounces * span
+    away = bounces % 2 == 0 # Moving away from the wall of the first bounce
+    if (velocity > 0) == away:
+        return high - offset, -speed
+    return low + offset, speed
+
+
+class Event(enum.IntEnum):
+    # What an EventBuffer entry reports. The meaning of its index and value depends on the kind:
+    BLOCK_DESTROYED = 0 # index: cell of the block in the BlockGrid
+    PADDLE_HIT = 1 # index: ball, value: where it hit the paddle, from 0 (left edge) to 1 (right edge)
+    WALL_BOUNCE = 2 # index: WALL_LEFT, WALL_RIGHT or WALL_TOP
+    LIFE_LOST = 3 # index: lives left, 0 when the game is over and the board started again
+    LEVEL_CLEARED = 4 # index: the level that was cleared (the board is already on the next one)
+
+
+WALL_LEFT: int = 0
+WALL_RIGHT: int = 1
+WALL_TOP: int = 2
+
+
+class EventBuffer:
+    # What happened during Board.update, for consumers that only want to handle the changes.
+    # Storage is allocated once. Events collect until `clear` is called, usually by the consumer once it has
+    # handled them. When the buffer is full, later events are dropped and `overflowed` is set, so the consumer
+    # knows to rescan the board instead.
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.kinds = array.array("B", bytes(capacity))
+        self.indices = array.array("i", bytes(4 * capacity))
+        self.values = array.array("d", bytes(8 * capacity))
+        self.count = 0
+        self.overflowed = False
+
+    def add(self, kind: Event, index: int = -1, value: float = 0.0):
+        count = self.count
+        if count == self.capacity:
+            self.overflowed = True
+            return
+        self.kinds[count] = kind
+        self.indices[count] = index
+        self.values[count] = value
+        self.count = count + 1
+
+    def clear(self):
+        self.count = 0
+        self.overflowed = False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        # (kind, index, value) in the order they happened. Kinds are plain ints that compare equal to Event members.
+        kinds, indices, values = self.kinds, self.indices, self.values
+        return ((kinds[i], indices[i], values[i]) for i in range(self.count))
 
 
 class Ball:
-    position: Vector[float] # Center
+    position: Vec2 # Center
     radius: float
-    velocity: Vector[float]
+    velocity: Vec2
     max_velocity: float
     
-    def __init__(self, position: Vector[float], radius: float):
+    def __init__(self, position: Vec2, radius: float, rng: random.Random = random):
         self.position = position
         self.radius = radius
-        self.velocity = Vector(random.choice([-5.0, 5.0]), -BASE_BALL_VELOCITY)
+        self.velocity = Vec2(rng.choice([-5.0, 5.0]), -BASE_BALL_VELOCITY)
         self.max_velocity = BASE_BALL_MAX_VELOCITY
 
     def update(self, delta_time: float):
         # Constant velocity kinematics (No gravity)
         #self.position = self.position + self.velocity * delta_time + 0.5 * vector_g * (delta_time ** 2)
         #self.velocity = self.velocity + vector_g * delta_time
-        self.position = self.position + self.velocity * delta_time
+        self.position.add_scaled(self.velocity, delta_time)
 
     def bounce_x(self):
-        self.velocity = Vector(-min(self.max_velocity, abs(self.velocity[0])) * (1 if self.velocity[0] > 0 else -1), self.velocity[1])
+        velocity = self.velocity
+        velocity.x = -min(self.max_velocity, abs(velocity.x)) * (1 if velocity.x > 0 else -1)
 
     def bounce_y(self):
-        self.velocity = Vector(self.velocity[0], -min(self.max_velocity, abs(self.velocity[1])) * (1 if self.velocity[1] > 0 else -1))
+        velocity = self.velocity
+        velocity.y = -min(self.max_velocity, abs(velocity.y)) * (1 if velocity.y > 0 else -1)
 
 
 class Direction(enum.Enum):
@@ -55,9 +251,9 @@ class Direction(enum.Enum):
     STOP = 0
 
 class Paddle:
-    position: Vector[float] # Top left
+    position: Vec2 # Top left
     size: tuple[float, float]
-    velocity: Vector[float]
+    velocity: Vec2
 
     board_width: float
     
@@ -66,10 +262,10 @@ class Paddle:
     acceleration_factor: float
     deceleration_factor: float
 
-    def __init__(self, position: Vector[float], size: tuple[float, float], board_width: float):
+    def __init__(self, position: Vec2, size: tuple[float, float], board_width: float):
         self.position = position
         self.size = size
-        self.velocity = Vector(0.0, 0.0)
+        self.velocity = Vec2(0.0, 0.0)
         
         self.board_width = board_width
 
@@ -79,14 +275,15 @@ class Paddle:
         self.deceleration_factor = self.acceleration_factor ** 1.5
 
     def update(self, direction: Direction, delta_time: float, speed_multiplier: float = 1.0):
-        current_speed: float = abs(self.velocity[0])
+        velocity = self.velocity
+        current_speed: float = abs(velocity.x)
 
         # === Deceleration ===
-        if direction == Direction.STOP:
+        if direction is Direction.STOP:
             if current_speed > 0:
                 current_speed = max(current_speed - current_speed * self.deceleration_factor * delta_time, 0.0)
-                self.velocity = Vector(current_speed * (1 if self.velocity[0] > 0 else -1), 0.0)
-                self.position = Vector(min(max(self.position[0] + self.velocity[0] * delta_time, 0.0), self.board_width - self.size[0]), self.position[1])
+                velocity.set(current_speed * (1 if velocity.x > 0 else -1), 0.0)
+                self.position.x = min(max(self.position.x + velocity.x * delta_time, 0.0), self.board_width - self.size[0])
             return
         
         # === Acceleration ===
@@ -101,13 +298,43 @@ class Paddle:
         # Exponential acceleration: v = v + (v * factor * dt)
         current_speed = min(current_speed + current_speed * self.acceleration_factor * delta_time, self.max_speed * speed_multiplier)
 
-        self.velocity = Vector(current_speed * direction.value, 0.0)
-        self.position = Vector(min(max(self.position[0] + self.velocity[0] * delta_time, 0.0), self.board_width - self.size[0]), self.position[1])
+        velocity.set(current_speed * direction.value, 0.0)
+        self.position.x = min(max(self.position.x + velocity.x * delta_time, 0.0), self.board_width - self.size[0])
+
+
+class Level(NamedTuple):
+    # A level ready to be played, built ahead of time by levels.LevelLoader
+    blocks: BlockGrid
+    ball_velocity: float
+    ball_max_velocity: float
+    paddle_width: float # In blocks
+    paddle_speed: float # Top speed as a fraction of the board width per second
+    paddle_acceleration: float
+
+
+class Prediction(NamedTuple):
+    # Where and when the ball next reaches the paddle line, see Board.predict
+    x: float # Ball centre
+    time: float # Seconds from now
+    velocity: tuple[float, float] # On arrival
+    blocks: list[int] # Cells of the blocks hit on the way, in order (only when blocks are taken into account)
+
+
+class BoardState(NamedTuple):
+    # Compact copy of everything that changes while a Board is played, see Board.snapshot
+    ball: tuple[float, float, float, float, float] # x, y, velocity x, velocity y, max velocity
+    paddle: tuple[float, float, float] # x, y, velocity x
+    alive: bytes
+    count: int
+    level: int
+    score: int
+    lives: int
+    rng: tuple
 
 
 class Board:
     ball: Ball
-    blocks: list[Block]
+    blocks: BlockGrid
     paddle: Paddle
     
     bounds: tuple[float, float]
@@ -122,106 +349,450 @@ class Board:
     level: int
     score: int
     lives: int
+    final_score: int # get_score() the last game ended with, before the board started again
 
-    def __init__(self, bounds: tuple[float, float], number_blocks: tuple[int, int] = COLUMS_ROWS, block_colours: list[tuple[int, int, int]] = BLOCK_COLOURS, level: int = 1, score: int = 0, lives: int = LIVES):
+    swept: bool # Continuous collision detection, see update_swept
+    rng: random.Random
+
+    ball_velocity: float # Launch speed
+    ball_max_velocity: float
+    levels: object | None # levels.LevelLoader, or anything else with get(level) -> Level
+    events: EventBuffer | None # Set one to have update report what happens, see EventBuffer
+
+    def __init__(self, bounds: tuple[float, float], number_blocks: tuple[int, int] = COLUMS_ROWS, block_colours: list[tuple[int, int, int]] = BLOCK_COLOURS, level: int = 1, score: int = 0, lives: int = LIVES, swept: bool = False, seed: int | None = None, levels: object | None = None):
         self.original_bounds = bounds
         block_size: float = bounds[0] / number_blocks[0]
         self.bounds = (bounds[0], max(bounds[1], ((number_blocks[1] - self.top_space) * block_size) * (1/self.block_percentage)))
         
-        self.blocks = []
         self.number_blocks = number_blocks
         self.block_colours = block_colours
-        for y in range(number_blocks[1]):
-            for x in range(number_blocks[0]):
-                self.blocks.append(Block(Vector(x * block_size, (y + self.top_space) * block_size), block_size, block_colours[y]))
+        self.blocks = BlockGrid(number_blocks, block_size, self.top_space, block_colours)
         self.block_area = ((number_blocks[1] + self.top_space) * block_size) + block_size
 
-        self.ball = Ball(Vector(self.original_bounds[0] / 2 - block_size / 2, self.original_bounds[1] * (1 - 0.1) + block_size / 2), block_size / 3) 
+        self.rng = random.Random(seed) # Seed it for reproducible runs
+        self.rng_state = None # Cached rng.getstate(), cleared whenever the rng is used
+        self.ball = Ball(Vec2(self.original_bounds[0] / 2 - block_size / 2, self.original_bounds[1] * (1 - 0.1) + block_size / 2), block_size / 3, self.rng) 
 
         paddle_size: tuple[float, float] = (block_size * 3, block_size / 2)
-        self.paddle = Paddle(Vector(self.original_bounds[0] / 2 - paddle_size[0] / 2, self.original_bounds[1] * (1 - 0.05)), paddle_size, self.original_bounds[0]) 
+        self.paddle = Paddle(Vec2(self.original_bounds[0] / 2 - paddle_size[0] / 2, self.original_bounds[1] * (1 - 0.05)), paddle_size, self.original_bounds[0]) 
         
         self.level = level
         self.score = score
         self.lives = lives
+        self.final_score = 0
+
+        self.swept = swept
+
+        self.ball_velocity = BASE_BALL_VELOCITY
+        self.ball_max_velocity = BASE_BALL_MAX_VELOCITY
+        self.levels = levels
+        self.events = None
+        if levels is not None:
+            self.apply_level(levels.get(level))
+            self.ball.position.set(self.original_bounds[0] / 2 - self.blocks.block_size / 2, self.original_bounds[1] * (1 - 0.1) + self.blocks.block_size / 2)
+            self.ball.velocity.y = -self.ball_velocity
+            self.ball.max_velocity = self.ball_max_velocity
+            self.paddle.position.set(self.original_bounds[0] / 2 - self.paddle.size[0] / 2, self.original_bounds[1] * (1 - 0.05))
+
+    def apply_level(self, level: Level):
+        # Switches to a level's blocks, geometry and ball and paddle settings. Cheap, the level is already built.
+        blocks = level.blocks
+        blocks.reset()
+        block_size = blocks.block_size
+        columns, rows = blocks.number_blocks
+        self.blocks = blocks
+        self.number_blocks = blocks.number_blocks
+        self.bounds = (self.original_bounds[0], max(self.original_bounds[1], ((rows - self.top_space) * block_size) * (1/self.block_percentage)))
+        self.block_area = ((rows + self.top_space) * block_size) + block_size
+
+        self.ball.radius = block_size / 3
+        self.ball_velocity = level.ball_velocity
+        self.ball_max_velocity = level.ball_max_velocity
+
+        paddle = self.paddle
+        paddle.size = (block_size * level.paddle_width, block_size / 2)
+        paddle.max_speed = level.paddle_speed * self.original_bounds[0]
+        paddle.acceleration_factor = level.paddle_acceleration
+        paddle.deceleration_factor = level.paddle_acceleration ** 1.5
+
+    def lose_life(self) -> int:
+        self.lives -= 1
+        if self.events is not None:
+            self.events.add(Event.LIFE_LOST, max(self.lives, 0))
+        self.score = int(max(self.score - 5 * (self.level ** 1.5), 0))
+        if self.lives <= 0: # Game Over
+            self.final_score = self.get_score()
+            self.reset()
+        else:
+            self.ball.position.set(self.original_bounds[0] / 2, self.original_bounds[1] * (1 - 0.1))
+            self.ball.velocity.set(self.random_velocity_x(), -self.ball_velocity)
+            self.paddle.position.set(self.original_bounds[0] / 2 - self.paddle.size[0] / 2, self.original_bounds[1] * (1 - 0.05))
+            self.paddle.velocity.set(0.0, 0.0)
+        return 0
 
     def update(self, paddle_direction: Direction, delta_time: float, paddle_speed_multiplier: float = 1.0) -> int:
-        self.ball.update(delta_time)
-        self.paddle.update(paddle_direction, delta_time, paddle_speed_multiplier)
+        if self.swept:
+            return self.update_swept(paddle_direction, delta_time, paddle_speed_multiplier)
+
+        ball = self.ball
+        paddle = self.paddle
+        ball.update(delta_time)
+        paddle.update(paddle_direction, delta_time, paddle_speed_multiplier)
+
+        position = ball.position
+        velocity = ball.velocity
+        radius = ball.radius
 
         # Check Wall Collisions
-        if self.ball.position[1] - self.ball.radius >= self.bounds[1]: # Bottom Wall
-            self.lives -= 1
-            if self.lives <= 0: # Game Over
-                self.reset()
-            else:
-                self.ball.position = Vector(self.original_bounds[0] / 2, self.original_bounds[1] * (1 - 0.1))
-                self.ball.velocity = Vector(random.choice([-5.0, 5.0]), -BASE_BALL_VELOCITY)
-                self.paddle.position = Vector(self.original_bounds[0] / 2 - self.paddle.size[0] / 2, self.original_bounds[1] * (1 - 0.05))
-                self.paddle.velocity = Vector(0.0, 0.0)
-            self.score = int(max(self.score - 5 * (self.level ** 1.5), 0))
-            return 0 
+        if position.y - radius >= self.bounds[1]: # Bottom Wall
+            return self.lose_life()
         
         # Left/Right Walls
-        if (self.ball.position[0] - self.ball.radius <= 0) or \
-           (self.ball.position[0] + self.ball.radius >= self.bounds[0]):
-            self.ball.bounce_x()
+        if (position.x - radius <= 0) or \
+           (position.x + radius >= self.bounds[0]):
+            ball.bounce_x()
             # Push ball out of wall to prevent sticking
-            if self.ball.velocity[0] > 0:
-                self.ball.position = Vector(self.ball.radius, self.ball.position[1])
+            if velocity.x > 0:
+                position.x = radius
             else:
-                self.ball.position = Vector(self.bounds[0] - self.ball.radius, self.ball.position[1])
+                position.x = self.bounds[0] - radius
+            if self.events is not None:
+                self.events.add(Event.WALL_BOUNCE, WALL_LEFT if velocity.x > 0 else WALL_RIGHT)
 
         # Top Wall
-        if (self.ball.position[1] - self.ball.radius <= 0):
-            self.ball.bounce_y()
-            self.ball.position = Vector(self.ball.position[0], self.ball.radius)
+        if (position.y - radius <= 0):
+            ball.bounce_y()
+            position.y = radius
+            if self.events is not None:
+                self.events.add(Event.WALL_BOUNCE, WALL_TOP)
 
         # Check Paddle Collision
-        if self.ball.position[1] + self.ball.radius >= self.paddle.position[1]: # Only if ball is at the height of the paddle
-
-            if (self.ball.position[0] >= self.paddle.position[0]) and \
-               (self.ball.position[0] <= self.paddle.position[0] + self.paddle.size[0]):
-                
-                # Calculate relative hit position (0 is left, 1 is right)
-                relative_intersect = (self.ball.position[0] - self.paddle.position[0]) / self.paddle.size[0]
+        if position.y + radius >= paddle.position.y: # Only if ball is at the height of the paddle
 
-                # 0.5 is center. < 0.5 sends left, > 0.5 sends right.
-                speed = (self.ball.velocity[0]**2 + self.ball.velocity[1]**2)**0.5
+            if (position.x >= paddle.position.x) and \
+               (position.x <= paddle.position.x + paddle.size[0]):
                 
-                # Map 0..1 to -1..1
-                bounce_angle = (relative_intersect - 0.5) * 2.0 
-
-                new_vx = speed * bounce_angle * 1.5
-                new_vy = -(speed * (1 - abs(bounce_angle) * 0.5))
-                
-                self.ball.velocity = Vector(new_vx, new_vy)
-
+                self.bounce_paddle()
                 return 3
 
 
         # Check Block Collisions
-        if self.ball.position[1] - self.ball.radius <= self.block_area: 
-            for block in self.blocks:
-                # AABB collision check. Not exact for a circle, but good enough and much faster than a circle-rectangle collision check.
-                if (self.ball.position[0] + self.ball.radius >= block.position[0] and 
-                    self.ball.position[0] - self.ball.radius <= block.position[0] + block.size and
-                    self.ball.position[1] + self.ball.radius >= block.position[1] and 
-                    self.ball.position[1] - self.ball.radius <= block.position[1] + block.size):
-                    
-                    self.blocks.remove(block)
-                    self.ball.bounce_y()
-                    self.score += 1
-                    return 2
+        if position.y - radius <= self.block_area: 
+            block = self.blocks.collide(position.x, position.y, radius)
+            if block is not None:
+                self.blocks.remove(block)
+                ball.bounce_y()
+                self.score += 1
+                if self.events is not None:
+                    self.events.add(Event.BLOCK_DESTROYED, block.index)
+                return 2
             if not self.blocks: # All blocks destroyed
-                self.score += 10
-                self.reset(level_up=True, score=self.score, lives=self.lives)
+                self.clear_level()
                 return -1
 
         return 1
 
+    def bounce_paddle(self):
+        position = self.ball.position
+        velocity = self.ball.velocity
+
+        # Calculate relative hit position (0 is left, 1 is right)
+        relative_intersect = (position.x - self.paddle.position.x) / self.paddle.size[0]
+
+        # 0.5 is center. < 0.5 sends left, > 0.5 sends right.
+        speed = (velocity.x**2 + velocity.y**2)**0.5
+        
+        # Map 0..1 to -1..1
+        bounce_angle = (relative_intersect - 0.5) * 2.0 
+
+        new_vx = speed * bounce_angle * 1.5
+        new_vy = -(speed * (1 - abs(bounce_angle) * 0.5))
+        
+        velocity.set(new_vx, new_vy)
+        if self.events is not None:
+            self.events.add(Event.PADDLE_HIT, 0, relative_intersect)
+
+    def clear_level(self):
+        # All blocks destroyed, on to the next level
+        if self.events is not None:
+            self.events.add(Event.LEVEL_CLEARED, self.level)
+        self.score += 10
+        self.reset(level_up=True, score=self.score, lives=self.lives)
+
+    def update_swept(self, paddle_direction: Direction, delta_time: float, paddle_speed_multiplier: float = 1.0) -> int:
+        # Continuous collision detection: move the ball to the first time of impact along its path, resolve it,
+        # and continue with the remaining time. The ball cannot tunnel through walls, the paddle or blocks,
+        # and several hits are resolved within one step, so much larger timesteps stay correct.
+        ball = self.ball
+        paddle = self.paddle
+        paddle.update(paddle_direction, delta_time, paddle_speed_multiplier)
+
+        position = ball.position
+        velocity = ball.velocity
+        radius = ball.radius
+        block_size = self.blocks.block_size
+        events = self.events
+
+        hit_paddle = False
+        hit_block = False
+        remaining = delta_time
+        for _ in range(MAX_SWEPT_COLLISIONS):
+            x, y = position.x, position.y
+            vx, vy = velocity.x, velocity.y
+            t_hit = remaining
+            event = None # "wall_x", "wall_y", "paddle" or "block"
+            hit: Block | None = None
+            hit_axis = 1
+
+            # Walls
+            if vx < 0:
+                t = max((radius - x) / vx, 0.0)
+                if t < t_hit:
+                    t_hit, event = t, "wall_x"
+            elif vx > 0:
+                t = max((self.bounds[0] - radius - x) / vx, 0.0)
+                if t < t_hit:
+                    t_hit, event = t, "wall_x"
+            if vy < 0:
+                t = max((radius - y) / vy, 0.0)
+                if t < t_hit:
+                    t_hit, event = t, "wall_y"
+
+            # Paddle (top edge only, like the discrete check)
+            if vy > 0:
+                t = max((paddle.position.y - radius - y) / vy, 0.0)
+                contact_x = x + vx * t
+                if t < t_hit and paddle.position.x <= contact_x <= paddle.position.x + paddle.size[0]:
+                    t_hit, event = t, "paddle"
+
+            # Blocks, only those in the cells the path sweeps over
+            end_x = x + vx * t_hit
+            end_y = y + vy * t_hit
+            if min(y, end_y) - radius <= self.block_area:
+                for block in self.blocks.query(min(x, end_x) - radius, min(y, end_y) - radius, max(x, end_x) + radius, max(y, end_y) + radius):
+                    t_enter, t_exit, axis = ray_box(x, y, vx, vy,
+                                                    block.position.x - radius, block.position.y - radius,
+                                                    block.position.x + block_size + radius, block.position.y + block_size + radius)
+                    if t_enter < t_exit and t_exit > 0 and t_enter < t_hit:
+                        # Already overlapping at the start of the sweep: reflect vertically like the discrete check
+                        t_hit, event, hit, hit_axis = max(t_enter, 0.0), "block", block, axis if t_enter >= 0 else 1
+
+            position.add_scaled(velocity, t_hit)
+            remaining -= t_hit
+            if event is None:
+                break
+
+            if event == "wall_x":
+                ball.bounce_x()
+                position.x = radius if velocity.x > 0 else self.bounds[0] - radius
+                if events is not None:
+                    events.add(Event.WALL_BOUNCE, WALL_LEFT if velocity.x > 0 else WALL_RIGHT)
+            elif event == "wall_y":
+                ball.bounce_y()
+                position.y = radius
+                if events is not None:
+                    events.add(Event.WALL_BOUNCE, WALL_TOP)
+            elif event == "paddle":
+                self.bounce_paddle()
+                hit_paddle = True
+            else:
+                self.blocks.remove(hit)
+                if hit_axis == 0:
+                    ball.bounce_x()
+                else:
+                    ball.bounce_y()
+                self.score += 1
+                hit_block = True
+                if events is not None:
+                    events.add(Event.BLOCK_DESTROYED, hit.index)
+                if not self.blocks: # All blocks destroyed
+                    self.clear_level()
+                    return -1
+        # If MAX_SWEPT_COLLISIONS is reached, the rest of the step is dropped rather than moving through obstacles
+
+        if position.y - radius >= self.bounds[1]: # Bottom Wall
+            return self.lose_life()
+        if hit_paddle:
+            return 3
+        if hit_block:
+            return 2
+        return 1
+
+    def first_block_hit(self, x: float, y: float, vx: float, vy: float, t_max: float, removed: set[int]) -> tuple[Block | None, float, int]:
+        # First block the ball hits moving from (x, y) for up to `t_max`, using the same test as update_swept.
+        # The path is cut into one slice per block row, visited in order, so only the cells along the path are looked at.
+        # Returns the block (or None), the time of impact and the axis it was hit on.
+        radius = self.ball.radius
+        block_size = self.blocks.block_size
+        columns, rows = self.blocks.number_blocks
+        end_y = y + vy * t_max
+        first_row = max(int(math.floor((min(y, end_y) - radius) / block_size)) - self.top_space, 0)
+        last_row = min(int(math.floor((max(y, end_y) + radius) / block_size)) - self.top_space, rows - 1)
+        order = range(first_row, last_row + 1) if vy > 0 else range(last_row, first_row - 1, -1)
+
+        hit, t_hit, hit_axis = None, t_max, 1
+        for row in order:
+            top = (row + self.top_space) * block_size - radius
+            bottom = top + block_size + 2 * radius
+            t_start, t_end = sorted(((top - y) / vy, (bottom - y) / vy))
+            t_start = max(t_start, 0.0)
+            t_end = min(t_end, t_hit)
+            if t_start >= t_hit: # Rows further along cannot be reached before the hit already found
+                break
+            if t_start > t_end:
+                continue
+            start_x = x + vx * t_start
+            end_x = x + vx * t_end
+            for block in self.blocks.query(min(start_x, end_x) - radius, top, max(start_x, end_x) + radius, bottom):
+                if block.index in removed:
+                    continue
+                t_enter, t_exit, axis = ray_box(x, y, vx, vy,
+                                                block.position.x - radius, block.position.y - radius,
+                                                block.position.x + block_size + radius, block.position.y + block_size + radius)
+                if t_enter < t_exit and t_exit > 0 and t_enter < t_hit:
+                    # Already overlapping at the start: reflect vertically like the discrete check
+                    hit, t_hit, hit_axis = block, max(t_enter, 0.0), axis if t_enter >= 0 else 1
+        return hit, t_hit, hit_axis
+
+    def predict(self, blocks: bool = False) -> Prediction | None:
+        # Where and when the ball will next reach the paddle line (its centre at paddle.position.y - radius),
+        # ignoring the paddle itself. Reflections off the side and top walls are unfolded in closed form.
+        # With `blocks`, the remaining blocks on the way are bounced off as well (and counted as destroyed),
+        # following the path event by event while it can reach the block area.
+        # Matches swept boards (up to ties at block corners) and closely approximates the discrete update.
+        # None if the ball never gets there.
+        ball = self.ball
+        radius = ball.radius
+        max_velocity = ball.max_velocity
+        x, y = ball.position.x, ball.position.y
+        vx, vy = ball.velocity.x, ball.velocity.y
+        left, right = radius, self.bounds[0] - radius
+        target = self.paddle.position.y - radius
+        elapsed = 0.0
+        hits = []
+
+        if blocks:
+            removed = set()
+            for _ in range(MAX_PREDICTED_BOUNCES):
+                if vy == 0:
+                    return None
+                if vy > 0 and y - radius > self.block_area:
+                    break
+
+                # Next wall bounce, or the moment the ball leaves the block area downwards
+                t_hit, event = math.inf, "leave"
+                if vx != 0:
+                    t_hit, event = max(((right if vx > 0 else left) - x) / vx, 0.0), "wall_x"
+                if vy < 0:
+                    t = max((radius - y) / vy, 0.0)
+                    if t < t_hit:
+                        t_hit, event = t, "wall_y"
+                else:
+                    t = (self.block_area + radius - y) / vy
+                    if t < t_hit:
+                        t_hit, event = t, "leave"
+
+                hit, t_block, hit_axis = self.first_block_hit(x, y, vx, vy, t_hit, removed)
+                if hit is not None:
+                    t_hit, event = t_block, "block"
+
+                x += vx * t_hit
+                y += vy * t_hit
+                elapsed += t_hit
+                if event == "wall_x":
+                    vx = -min(max_velocity, abs(vx)) * (1 if vx > 0 else -1)
+                    x = left if vx > 0 else right
+                elif event == "wall_y":
+                    vy = -min(max_velocity, abs(vy)) * (1 if vy > 0 else -1)
+                    y = radius
+                elif event == "block":
+                    removed.add(hit.index)
+                    hits.append(hit.index)
+                    if hit_axis == 0 and self.swept:
+                        vx = -min(max_velocity, abs(vx)) * (1 if vx > 0 else -1)
+                    else:
+                        vy = -min(max_velocity, abs(vy)) * (1 if vy > 0 else -1)
+                else:
+                    break
+            else:
+                return None
+
+        # Top wall, then straight down to the paddle line
+        if vy == 0:
+            return None
+        if vy < 0:
+            speed_y = min(max_velocity, -vy)
+            duration = max((y - radius) / -vy, 0.0) + (target - radius) / speed_y
+            vy = speed_y
+        else:
+            duration = max((target - y) / vy, 0.0)
+        x, vx = unfold(x, vx, left, right, duration, max_velocity)
+        return Prediction(x, elapsed + duration, (vx, vy), hits)
+
     def get_score(self) -> int:
         return self.score * 15 + self.level ** 3
+
+    def ball_positions(self) -> list[tuple[float, float]]:
+        # Centres of every ball in play
+        return [(self.ball.position.x, self.ball.position.y)]
+
+    def speed_up(self, factor: float):
+        # Raises the speed limit of every ball in play
+        self.ball.max_velocity *= factor
     
     def reset(self, level_up: bool = False, score: int = 0, lives: int = 0):
-        self.__init__(self.original_bounds, self.number_blocks, self.block_colours, self.level + 1 if level_up else 1, score, lives or LIVES)
\ No newline at end of file
+        # Puts the board back to the start of a level in place, without rebuilding any objects
+        self.level = self.level + 1 if level_up else 1
+        if self.levels is not None:
+            self.apply_level(self.levels.get(self.level))
+        else:
+            self.blocks.reset()
+        block_size = self.blocks.block_size
+
+        self.ball.position.set(self.original_bounds[0] / 2 - block_size / 2, self.original_bounds[1] * (1 - 0.1) + block_size / 2)
+        self.ball.velocity.set(self.random_velocity_x(), -self.ball_velocity)
+        self.ball.max_velocity = self.ball_max_velocity
+
+        self.paddle.position.set(self.original_bounds[0] / 2 - self.paddle.size[0] / 2, self.original_bounds[1] * (1 - 0.05))
+        self.paddle.velocity.set(0.0, 0.0)
+
+        self.score = score
+        self.lives = lives or LIVES
+
+    def random_velocity_x(self) -> float:
+        self.rng_state = None
+        return self.rng.choice([-5.0, 5.0])
+
+    def snapshot(self) -> BoardState:
+        # Getting the RNG state is the expensive part, and it only changes when the ball respawns
+        if self.rng_state is None:
+            self.rng_state = self.rng.getstate()
+        ball = self.ball
+        paddle = self.paddle
+        return BoardState(
+            (ball.position.x, ball.position.y, ball.velocity.x, ball.velocity.y, ball.max_velocity),
+            (paddle.position.x, paddle.position.y, paddle.velocity.x),
+            bytes(self.blocks.alive),
+            self.blocks.count,
+            self.level,
+            self.score,
+            self.lives,
+            self.rng_state,
+        )
+
+    def restore(self, state: BoardState):
+        # The state must come from a board with the same layout
+        ball = self.ball
+        paddle = self.paddle
+        ball.position.x, ball.position.y, ball.velocity.x, ball.velocity.y, ball.max_velocity = state.ball
+        paddle.position.x, paddle.position.y, paddle.velocity.x = state.paddle
+        paddle.velocity.y = 0.0
+        if self.levels is not None and state.level != self.level:
+            self.apply_level(self.levels.get(state.level))
+        self.blocks.restore(state.alive, state.count)
+        self.level = state.level
+        self.score = state.score
+        self.lives = state.lives
+        if state.rng is not self.rng_state:
+            self.rng.setstate(state.rng)
+            self.rng_state = state.rng
\ No newline at end of file
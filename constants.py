@@ -1,4 +1,7 @@
-FPS: int = 60
+FPS: int = 60 # Simulation steps per second
+FRAME_CAP: int | None = None # Rendered frames per second. None follows the display's refresh rate, 0 is uncapped.
+MAX_STEPS_PER_FRAME: int = 5 # Simulation steps a slow frame may catch up on before the game slows down instead
+INPUT_RATE: int = 1000 # Hz the controls are sampled at while waiting for the next frame. 0 samples once per frame only.
 COLUMS_ROWS: tuple[int, int] = (15, 6)
 TITLE: str = "Breakout"
 WINDOW_SIZE: tuple[int, int] = (1200, 1200)
@@ -8,7 +11,9 @@ FONT_SIZE: int = 24
 
 BOARD_SIZE: tuple[float, float] = (800, 1000)
 BORDER_SIZE: float = 20.0
+EFFECTS_ON_BOARD: bool = False # Run video effects on the board surface only instead of the whole window
 LIVES: int = 5
+MAX_DIRTY_BALLS: int = 32 # Above this many balls the board is redrawn whole instead of rectangle by rectangle
 
 BASE_BALL_MAX_VELOCITY: float = 55.0
 BASE_BALL_VELOCITY: float = 40.0
@@ -16,7 +21,11 @@ LEVEL_BALL_SPEED_MULTIPLIER: float = 1.3
 PADDLE_ACCELERATION_FACTOR: float = 1.4
 PADDLE_BASE_SPEED_MULTIPLIER: float = 0.02
 PADDLE_MAX_SPEED_MULTIPLIER: float = 0.14
+MAX_SWEPT_COLLISIONS: int = 16 # Collisions resolved per step in swept mode
+MAX_PREDICTED_BOUNCES: int = 64 # Wall and block bounces Board.predict follows through the block area before giving up
 
 AUDIO_BIT_DEPTH: int = 16
 AUDIO_SAMPLE_RATE: int = 44100
 AUDIO_CHANNELS: int = 2 # Valid options are 2 and 3. Mono or higher values are not supported by pygame.
+AUDIO_VOICES: int = 8 # Mixer channels reserved for sound effects. The oldest, least important one is cut off when all are busy.
+AUDIO_CACHE_PATH: str | None = "~/.cache/breakout/audio" # Where generated sounds are kept between runs. None keeps them in memory only.
@@ -0,0 +1,50 @@
+# Paddle input sampling and latency timestamps. SDL only updates the keyboard and joystick state when the main
+# thread pumps events, so a background thread cannot see input any sooner than the game loop can. The controls are
+# therefore sampled on the main thread: once right after the event loop, before the frame's simulation steps, and
+# again after the pumps while the loop waits for the next frame. Each change is published as one immutable tuple with
+# the time it was first seen, which is what the input latency measurement starts from.
+from components import Direction
+from constants import *
+
+from collections import deque
+from typing import Callable, NamedTuple
+import time
+
+
+Sampler = Callable[[], tuple[Direction, float]] # Returns the paddle direction and speed multiplier
+
+
+class Intent(NamedTuple):
+    direction: Direction
+    speed_multiplier: float
+    timestamp: int # time.perf_counter_ns() when the change was first sampled
+    sequence: int # Increases with every change
+
+
+class InputSampler:
+    def __init__(self, sample: Sampler, rate: int = INPUT_RATE, history: int = 256):
+        self.sample = sample
+        self.interval = 1_000_000_000 // rate if rate > 0 else 0 # Nanoseconds between samples while idle
+        self.latest = Intent(Direction.STOP, 1.0, time.perf_counter_ns(), 0)
+        self.events: deque[Intent] = deque(maxlen=history) # Recent changes, oldest first
+        self.next_sample = 0 # time.perf_counter_ns() the next idle sample is due at
+
+    def publish(self, direction: Direction, speed_multiplier: float):
+        latest = self.latest
+        if direction is latest.direction and speed_multiplier == latest.speed_multiplier:
+            return
+        intent = Intent(direction, speed_multiplier, time.perf_counter_ns(), latest.sequence + 1)
+        self.events.append(intent)
+        self.latest = intent
+
+    def update(self) -> Intent:
+        # Samples now. Call it right after events were pumped.
+        self.publish(*self.sample())
+        self.next_sample = time.perf_counter_ns() + self.interval
+        return self.latest
+
+    def poll(self):
+        # Samples at most `rate` times a second, for the pumps while waiting for the next frame. Without a rate,
+        # only `update` samples.
+        if self.interval > 0 and time.perf_counter_ns() >= self.next_sample:
+            self.update()
@@ -0,0 +1,298 @@
+# Local environment server. One process hosts a pool of Boards, and any number of agent processes connect over a
+# Unix domain socket to reset and step them. Requests that arrive within a short window are answered as one batch,
+# with one write per client. Client sockets are non-blocking and every client has its own output buffer, so a client
+# that reads slowly only delays itself. Neither side needs pygame.
+#
+# Protocol (little endian):
+#   hello     client: "BKES", version (u16), boards wanted (u16)
+#             server: "BKES", version (u16), boards granted (u16, 0 if the pool is exhausted), columns (u16), rows (u16)
+#   request   command (u8), board (u16, 0 .. granted - 1), direction (i8), paddle speed multiplier (f32)
+#   response  board (u16), Board.update code (i8), score (i64), lives (i32), level (i32),
+#             observation (f32 each, written by observation.write_observation)
+from components import Board, Direction
+from constants import *
+from observation import observation_size, write_observation
+from sim import advance
+
+from array import array
+from typing import NamedTuple
+import argparse
+import numpy as np
+import os
+import selectors
+import socket
+import struct
+import time
+
+
+MAGIC: bytes = b"BKES"
+VERSION: int = 1
+HELLO = struct.Struct("<4sHH")
+HELLO_REPLY = struct.Struct("<4sHHHH")
+REQUEST = struct.Struct("<BHbf")
+RESPONSE = struct.Struct("<Hbqii")
+
+RESET: int = 0
+STEP: int = 1
+
+DIRECTIONS: dict[int, Direction] = {direction.value: direction for direction in Direction}
+OUTPUT_LIMIT: int = 1 << 22 # Bytes of unsent responses after which a client's requests are not read until it catches up
+
+
+def observation_bytes(board: Board, out: np.ndarray) -> bytes:
+    # `out` is a float32 array of observation_size(board.number_blocks), reused between calls
+    write_observation(board, out)
+    return out.tobytes()
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("environment server connection closed")
+        data += chunk
+    return bytes(data)
+
+
+class _Client:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.output = bytearray() # Responses not yet sent
+        self.boards: list[int] | None = None # Pool indices, None until the hello is received
+        self.requests: list[tuple[int, int, int, float]] = []
+
+
+class EnvServer:
+    def __init__(self, path: str, num_boards: int = 64, number_blocks: tuple[int, int] = COLUMS_ROWS, delta_time: float = 1.0 / FPS, batch_window: float = 0.001, seed: int | None = None):
+        self.path = path
+        self.number_blocks = number_blocks
+        self.delta_time = delta_time
+        self.batch_window = batch_window # Seconds to wait for more requests after the first one of a batch
+        self.boards = [Board(BOARD_SIZE, number_blocks, seed=None if seed is None else seed + i) for i in range(num_boards)]
+        self.observation = np.empty(observation_size(number_blocks), dtype=np.float32)
+        self.free = list(range(num_boards - 1, -1, -1))
+        self.batches = 0
+        self.requests = 0
+
+        if os.path.exists(path):
+            os.unlink(path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        self.listener.listen()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients: dict[socket.socket, _Client] = {}
+        self.running = False
+
+    def accept(self):
+        sock, _ = self.listener.accept()
+        sock.setblocking(False)
+        self.clients[sock] = _Client(sock)
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def disconnect(self, client: _Client):
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        del self.clients[client.sock]
+        if client.boards:
+            for index in client.boards:
+                self.boards[index].reset()
+            self.free.extend(client.boards)
+
+    def send(self, client: _Client, data: bytes) -> bool:
+        # Queues `data` and sends as much as the socket takes. Returns False if the client was disconnected.
+        client.output += data
+        return self.flush(client)
+
+    def flush(self, client: _Client) -> bool:
+        try:
+            sent = client.sock.send(client.output) if client.output else 0
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.disconnect(client)
+            return False
+        del client.output[:sent]
+        # Wait for the socket to become writable while output is left, and stop reading from a client that is far behind
+        events = (selectors.EVENT_READ if len(client.output) < OUTPUT_LIMIT else 0) | (selectors.EVENT_WRITE if client.output else 0)
+        self.selector.modify(client.sock, events)
+        return True
+
+    def receive(self, client: _Client):
+        try:
+            data = client.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.disconnect(client)
+            return
+        if not data:
+            self.disconnect(client)
+            return
+        client.buffer += data
+
+        if client.boards is None:
+            if len(client.buffer) < HELLO.size:
+                return
+            magic, version, wanted = HELLO.unpack_from(client.buffer)
+            del client.buffer[:HELLO.size]
+            if magic != MAGIC or version != VERSION:
+                self.disconnect(client)
+                return
+            granted = wanted if wanted <= len(self.free) else 0
+            client.boards = [self.free.pop() for _ in range(granted)]
+            if not self.send(client, HELLO_REPLY.pack(MAGIC, VERSION, granted, *self.number_blocks)):
+                return
+
+        complete = len(client.buffer) - len(client.buffer) % REQUEST.size
+        for offset in range(0, complete, REQUEST.size):
+            request = REQUEST.unpack_from(client.buffer, offset)
+            if request[1] >= len(client.boards) or request[0] not in (RESET, STEP) or request[2] not in DIRECTIONS:
+                self.disconnect(client)
+                return
+            client.requests.append(request)
+        del client.buffer[:complete]
+
+    def process(self):
+        # Runs every queued request and answers each client with a single write
+        for client in list(self.clients.values()):
+            if not client.requests:
+                continue
+            out = bytearray()
+            for command, index, direction, speed_multiplier in client.requests:
+                board = self.boards[client.boards[index]]
+                if command == STEP:
+                    code = advance(board, DIRECTIONS[direction], self.delta_time, speed_multiplier)
+                else:
+                    board.reset()
+                    code = 1
+                out += RESPONSE.pack(index, code, board.get_score(), board.lives, board.level)
+                out += observation_bytes(board, self.observation)
+            self.requests += len(client.requests)
+            client.requests.clear()
+            self.send(client, out)
+        self.batches += 1
+
+    def serve_forever(self):
+        self.running = True
+        deadline = None # End of the current batch window
+        while self.running:
+            timeout = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+            for key, events in self.selector.select(timeout):
+                if key.fileobj is self.listener:
+                    self.accept()
+                    continue
+                client = self.clients.get(key.fileobj)
+                if client is not None and events & selectors.EVENT_WRITE:
+                    if not self.flush(client):
+                        continue
+                if client is not None and events & selectors.EVENT_READ:
+                    self.receive(client)
+
+            waiting = sum(1 for client in self.clients.values() if client.requests)
+            if not waiting:
+                deadline = None
+                continue
+            if deadline is None:
+                deadline = time.perf_counter() + self.batch_window
+            # No point in waiting once every client has a request in
+            if waiting == len(self.clients) or time.perf_counter() >= deadline:
+                self.process()
+                deadline = None
+
+    def close(self):
+        self.running = False
+        for client in list(self.clients.values()):
+            self.disconnect(client)
+        self.selector.close()
+        self.listener.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self) -> "EnvServer":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class StepResult(NamedTuple):
+    observation: array # float32
+    code: int
+    score: int
+    lives: int
+    level: int
+
+
+class EnvClient:
+    # Connects to an EnvServer and borrows `boards` boards from its pool, addressed as 0 .. boards - 1
+    def __init__(self, path: str, boards: int = 1):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.sock.sendall(HELLO.pack(MAGIC, VERSION, boards))
+        magic, version, granted, columns, rows = HELLO_REPLY.unpack(recv_exactly(self.sock, HELLO_REPLY.size))
+        if magic != MAGIC or version != VERSION:
+            raise ConnectionError(f"not a version {VERSION} environment server")
+        if granted < boards:
+            self.sock.close()
+            raise ConnectionError(f"environment server has fewer than {boards} free boards")
+        self.num_boards = granted
+        self.number_blocks = (columns, rows)
+        self.observation_size = observation_size((columns, rows))
+        self.response_size = RESPONSE.size + 4 * self.observation_size
+
+    def _send(self, requests: list[tuple[int, int, int, float]]) -> list[StepResult]:
+        self.sock.sendall(b"".join(REQUEST.pack(*request) for request in requests))
+        data = recv_exactly(self.sock, self.response_size * len(requests))
+        results = [None] * len(requests)
+        for offset in range(0, len(data), self.response_size):
+            index, code, score, lives, level = RESPONSE.unpack_from(data, offset)
+            observation = array("f", data[offset + RESPONSE.size:offset + self.response_size])
+            results[offset // self.response_size] = StepResult(observation, code, score, lives, level)
+        return results
+
+    def reset(self, board: int = 0) -> StepResult:
+        return self._send([(RESET, board, 0, 1.0)])[0]
+
+    def step(self, direction: Direction | int, speed_multiplier: float = 1.0, board: int = 0) -> StepResult:
+        return self._send([(STEP, board, getattr(direction, "value", direction), speed_multiplier)])[0]
+
+    def step_all(self, directions: list[Direction | int], speed_multipliers: list[float] | None = None) -> list[StepResult]:
+        # Steps every borrowed board with one round trip
+        speed_multipliers = speed_multipliers or [1.0] * len(directions)
+        return self._send([(STEP, board, getattr(direction, "value", direction), speed_multiplier) for board, (direction, speed_multiplier) in enumerate(zip(directions, speed_multipliers))])
+
+    def reset_all(self) -> list[StepResult]:
+        return self._send([(RESET, board, 0, 1.0) for board in range(self.num_boards)])
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self) -> "EnvClient":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Breakout environment server")
+    parser.add_argument("socket", help="path of the Unix domain socket to listen on")
+    parser.add_argument("--boards", type=int, default=64, help="number of boards in the pool")
+    parser.add_argument("--window", type=float, default=1.0, help="batching window in milliseconds")
+    parser.add_argument("--delta-time", type=float, default=1.0 / FPS, help="seconds simulated per step")
+    parser.add_argument("--seed", type=int, default=None, help="seed board i with seed + i")
+    args = parser.parse_args()
+
+    with EnvServer(args.socket, args.boards, delta_time=args.delta_time, batch_window=args.window / 1000, seed=args.seed) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,155 +1,400 @@
-from components import *
+from colours import *
+from components import Block, Board, Direction, Event, EventBuffer
 from constants import *
+from controls import InputSampler
+from pacing import FrameScheduler, refresh_rate
+from profiler import FrameProfiler, NullProfiler, StartupProfiler
 from pygame.locals import *
-from sound.sound import *
-from video.effects import *
+from replay import InputRecorder
+from sim import advance
+from sound.engine import NullSequencer, NullVoicePool, Sequencer, SoundBank, VoicePool, reserve_channels
+from video.effects import ColourShiftEffect, Effect, ScanlineEffect, apply_effects
+from video.hud import Hud
+from video.overlay import ProfilerOverlay
 
 import pygame
+import random
+import threading
+import time
 
 
 class Game:
-    def __init__(self):
-        pygame.mixer.pre_init(AUDIO_SAMPLE_RATE, -AUDIO_BIT_DEPTH, AUDIO_CHANNELS)
+    def __init__(self, seed: int | None = None, record_path: str | None = None, profile: bool = False, profile_path: str | None = None, balls: int = 1, levels_path: str | None = None, frame_cap: int | None = FRAME_CAP, startup: StartupProfiler | None = None, effects: bool = True):
+        # Only what the first frame needs happens here. The audio is loaded on a background thread
+        # and joysticks are looked for once the first frame is on screen.
+        self.startup = startup or StartupProfiler()
+        self.startup_report = startup is not None # Print the start-up timings once the first frame is on screen
+        self.startup.mark("imports")
 
-        pygame.init()
-        
-        pygame.joystick.init()
-        self.joystick = None
-        self.joystick_deadzone = 0.1
-        if pygame.joystick.get_count() > 0:
-            self.joystick = pygame.joystick.Joystick(0)
-            self.joystick.init()
-        
+        pygame.display.init()
         pygame.font.init()
         self.font = pygame.font.Font(FONT_PATH, FONT_SIZE)
+        self.startup.mark("pygame")
 
         self.display = pygame.display.set_mode(WINDOW_SIZE)
         pygame.display.set_caption(TITLE)
+        self.startup.mark("display")
 
-        self.active_effects = [] #[ColourShiftEffect(), ScanlineEffect()] # Sadly these effects are too performance intensive for PyGame to handle
+        self.joystick = None
+        self.joystick_deadzone = 0.1
+
+        # Silent until the mixer is open and the sounds are loaded. The audio thread sets the sounds
+        # before swapping in the real voice pool and sequencer, so these never see a missing sound.
+        self.block_hit_sound: pygame.mixer.Sound | None = None
+        self.paddle_hit_sound: pygame.mixer.Sound | None = None
+        self.game_over_sound: list[pygame.mixer.Sound] = []
+        self.clear_level_sound: list[pygame.mixer.Sound] = []
+        self.voices = NullVoicePool()
+        self.sequencer = NullSequencer()
+        self.audio_thread = threading.Thread(target=self.load_audio, name="audio", daemon=True)
+        self.audio_thread.start()
+
+        # Both effects together take about 5 ms a frame on the window and 2.7 ms on the board (benchmarks/effects.py).
+        # With the full redraw that window effects need, a frame takes about 10 ms, well inside a 60 FPS frame.
+        self.active_effects = [ColourShiftEffect(), ScanlineEffect()] if effects else []
         self.paused_effects = []
 
-        self.fps = pygame.time.Clock()
-        self.fps.tick(FPS)
+        self.scheduler = FrameScheduler(1.0 / FPS, refresh_rate() if frame_cap is None else frame_cap)
+        # Ball centres and paddle x before the last simulation step, to interpolate from when rendering
+        self.previous_balls: list[tuple[float, float]] = []
+        self.previous_paddle: float | None = None
+        self.alpha = 1.0 # Position between the last two steps to render at
 
         self.paused = False
 
-        self.board = Board(BOARD_SIZE, COLUMS_ROWS)
-        self.paddle_speed_multiplier = 1.0
+        if seed is None and record_path is not None:
+            seed = random.getrandbits(63) # Recordings need a known seed to be replayable
+        self.levels = None
+        if levels_path is not None:
+            from levels import LevelLoader, LevelPack
+
+            self.levels = LevelLoader(LevelPack(levels_path), BOARD_SIZE[0])
+        if balls > 1:
+            from multi_ball import MultiBallBoard
+
+            self.board = MultiBallBoard(BOARD_SIZE, COLUMS_ROWS, seed=seed, levels=self.levels, balls=balls)
+        else:
+            self.board = Board(BOARD_SIZE, COLUMS_ROWS, seed=seed, levels=self.levels)
+        self.board.events = EventBuffer() # Tells the block layer which blocks to erase, see update_block_layer
+        self.recorder = InputRecorder(record_path, seed) if record_path is not None else None
+        self.controls = InputSampler(self.read_controls)
+        self.applied_input = 0 # Sequence number of the last paddle intent the board was stepped with
+        self.startup.mark("board")
 
         self.board_surface = pygame.Surface(BOARD_SIZE)
         self.board_position = ((WINDOW_SIZE[0] - BOARD_SIZE[0]) / 2, (WINDOW_SIZE[1] - BOARD_SIZE[1]) / 2)
         self.board_background = pygame.Surface((BOARD_SIZE[0] + BORDER_SIZE * 2, BOARD_SIZE[1] + BORDER_SIZE * 2))
+        self.board_background.fill(GREY)
         self.board_background_position = (self.board_position[0] - BORDER_SIZE, self.board_position[1] - BORDER_SIZE)
 
-        self.block_hit_sound = Sound(1000, 0.1).generate()
-        self.game_over_sound = [Sound(200, 0.5).generate(), Sound(150, 0.5).generate(), Sound(100, 0.5).generate()]
-        self.clear_level_sound = [Sound(800, 0.5).generate(), Sound(5600, 0.5).generate(), Sound(10200, 0.5).generate()]
-        self.paddle_hit_sound = Sound(500, 0.1).generate()
+        # Pre-rendered block field. Only redrawn when a block is destroyed or the level resets.
+        self.block_layer = pygame.Surface(BOARD_SIZE)
+        self.drawn_blocks = None # BlockGrid (and its revision) the block layer was drawn from
+        self.drawn_revision = -1
+        self.drawn_alive = bytearray()
 
-    def draw_board(self):
-        self.board_background.fill(GREY)
-        self.display.blit(self.board_background, self.board_background_position)
+        # Dirty rectangle rendering. Board-space rectangles the ball and paddle covered last frame.
+        self.full_redraw = True
+        self.ball_rects: list[pygame.Rect] = []
+        self.paddle_rect = pygame.Rect(0, 0, 0, 0)
+
+        self.hud = Hud(self.font, (self.board_position[0] - BORDER_SIZE, self.board_position[1] - BORDER_SIZE - 5))
 
-        self.board_surface.fill(BLACK)
+        # Per-phase frame timing. F3 toggles the overlay, the data is written to `profile_path` on exit.
+        profile = profile or profile_path is not None
+        self.profiler = FrameProfiler() if profile else NullProfiler()
+        self.profile_path = profile_path
+        self.profiler_overlay = None
+        if profile:
+            overlay_position = (self.board_position[0] + BOARD_SIZE[0] + BORDER_SIZE + 5, self.board_position[1] - BORDER_SIZE)
+            self.profiler_overlay = ProfilerOverlay(pygame.font.Font(FONT_PATH, FONT_SIZE // 2), overlay_position)
+        self.show_profiler = profile
+        self.startup.mark("surfaces")
 
-        for block in self.board.blocks:
-            x = int(round(block.position[0]))
-            y = int(round(block.position[1]))
-            next_x = int(round(block.position[0] + block.size))
-            next_y = int(round(block.position[1] + block.size))
+    def load_audio(self):
+        # Runs on the audio thread. Opening the audio device can take longer than everything else together.
+        started = time.perf_counter_ns()
+        try:
+            pygame.mixer.init(AUDIO_SAMPLE_RATE, -AUDIO_BIT_DEPTH, AUDIO_CHANNELS)
+        except pygame.error: # No audio device, play without sound
+            return
+        # Hits share a pool of voices, cues play note by note on a channel of their own
+        channels = reserve_channels(AUDIO_VOICES + 1)
+        sounds = SoundBank()
+        self.block_hit_sound = sounds.get(1000, 0.1)
+        self.game_over_sound = [sounds.get(200, 0.5), sounds.get(150, 0.5), sounds.get(100, 0.5)]
+        self.clear_level_sound = [sounds.get(800, 0.5), sounds.get(5600, 0.5), sounds.get(10200, 0.5)]
+        self.paddle_hit_sound = sounds.get(500, 0.1)
+        self.voices = VoicePool(channels[:AUDIO_VOICES])
+        self.sequencer = Sequencer(channels[AUDIO_VOICES])
+        self.startup.record("audio", started, time.perf_counter_ns())
 
-            width = next_x - x
-            height = next_y - y
-            
-            pygame.draw.rect(self.board_surface, block.colour, (x, y, width, height))
+    def find_joysticks(self):
+        # Joystick discovery can be slow, so it waits until the first frame is on screen. Connected joysticks
+        # (and ones plugged in later) then arrive as JOYDEVICEADDED events.
+        started = time.perf_counter_ns()
+        pygame.joystick.init()
+        self.startup.record("joysticks", started, time.perf_counter_ns())
 
-        pygame.draw.circle(self.board_surface, WHITE, (int(self.board.ball.position[0]), int(self.board.ball.position[1])), int(self.board.ball.radius))
+    def block_rect(self, block: Block) -> pygame.Rect:
+        x = int(round(block.position[0]))
+        y = int(round(block.position[1]))
+        next_x = int(round(block.position[0] + block.size))
+        next_y = int(round(block.position[1] + block.size))
 
-        pygame.draw.rect(self.board_surface, BROWN, (*self.board.paddle.position, *self.board.paddle.size))
+        return pygame.Rect(x, y, next_x - x, next_y - y)
 
-        self.display.blit(self.board_surface, self.board_position)
+    def update_block_layer(self) -> list[pygame.Rect]:
+        # Bring the block layer in line with the board. Returns the board-space rectangles that changed.
+        # Consumes the board's events.
+        blocks = self.board.blocks
+        events = self.board.events
+        if blocks is not self.drawn_blocks or blocks.revision != self.drawn_revision:
+            self.block_layer.fill(BLACK)
+            for block in blocks:
+                pygame.draw.rect(self.block_layer, block.colour, self.block_rect(block))
+            self.drawn_blocks = blocks
+            self.drawn_revision = blocks.revision
+            self.drawn_alive = bytearray(blocks.alive)
+            events.clear()
+            return [self.block_layer.get_rect()]
 
-    def draw_score(self):
-        level_string = f"Level: {self.board.level}"
-        score_string = f"Score: {self.board.get_score()}"
-        lives_string = f"Lives: {self.board.lives}"
+        changed = []
+        if not events.overflowed:
+            # Only the blocks destroyed since the last frame
+            for kind, index, _ in events:
+                if kind == Event.BLOCK_DESTROYED and self.drawn_alive[index]:
+                    rect = self.block_rect(blocks.blocks[index])
+                    self.block_layer.fill(BLACK, rect)
+                    changed.append(rect)
+                    self.drawn_alive[index] = 0
+            events.clear()
+            return changed
 
-        level_text = self.font.render(level_string, True, WHITE)
-        score_text = self.font.render(score_string, True, WHITE)
-        lives_text = self.font.render(lives_string, True, WHITE)
+        # Too much happened to keep track of, compare every cell instead
+        events.clear()
+        if blocks.count == self.drawn_alive.count(1):
+            return []
+        for index, (alive, drawn) in enumerate(zip(blocks.alive, self.drawn_alive)):
+            if alive != drawn:
+                rect = self.block_rect(blocks.blocks[index])
+                self.block_layer.fill(BLACK, rect)
+                changed.append(rect)
+        self.drawn_alive = bytearray(blocks.alive)
+        return changed
 
-        self.display.blit(level_text, (self.board_position[0] - BORDER_SIZE, self.board_position[1] - level_text.get_height() - BORDER_SIZE - 5))
-        self.display.blit(score_text, (self.board_position[0] - BORDER_SIZE + level_text.get_width() + 10, self.board_position[1] - score_text.get_height() - BORDER_SIZE - 5))
-        self.display.blit(lives_text, (self.board_position[0] - BORDER_SIZE + level_text.get_width() + score_text.get_width() + 20, self.board_position[1] - lives_text.get_height() - BORDER_SIZE - 5))
+    def ball_positions(self) -> list[tuple[float, float]]:
+        # Ball centres to draw, interpolated between the last two simulation steps
+        current = self.board.ball_positions()
+        previous = self.previous_balls
+        alpha = self.alpha
+        if alpha >= 1.0 or len(previous) != len(current):
+            return current
+        return [(x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha) for (x0, y0), (x1, y1) in zip(previous, current)]
 
-    def draw(self):
-        self.display.fill(BLACK)
-        self.draw_board()
-        self.draw_score()
+    def paddle_x(self) -> float:
+        current = self.board.paddle.position.x
+        if self.previous_paddle is None or self.alpha >= 1.0:
+            return current
+        return self.previous_paddle + (current - self.previous_paddle) * self.alpha
 
-        if not self.paused:
-            for effect in self.active_effects:
-                effect.apply(self.display)
+    def draw_board(self, effects: list[Effect] | None = None) -> list[pygame.Rect]:
+        # Draws the board onto the display. Returns the display rectangles that changed,
+        # which is everything after a full redraw and only the moving parts otherwise.
+        # Effects passed in here only run on the board surface.
+        effects = effects or []
+        dirty = self.update_block_layer()
+        # With many balls on the board, blitting the whole board beats blitting hundreds of small rectangles
+        redraw_board = self.full_redraw or bool(effects) or len(self.ball_rects) > MAX_DIRTY_BALLS
+        if redraw_board:
+            if self.full_redraw:
+                self.display.blit(self.board_background, self.board_background_position)
+            self.board_surface.blit(self.block_layer, (0, 0))
         else:
-            for effect in self.paused_effects:
-                effect.apply(self.display)
+            dirty += self.ball_rects + [self.paddle_rect]
+            for rect in dirty:
+                self.board_surface.blit(self.block_layer, rect, rect)
+
+        radius = int(self.board.ball.radius)
+        self.ball_rects = [pygame.draw.circle(self.board_surface, WHITE, (int(x), int(y)), radius) for x, y in self.ball_positions()]
+
+        paddle = self.board.paddle
+        self.paddle_rect = pygame.draw.rect(self.board_surface, BROWN, (self.paddle_x(), paddle.position.y, *paddle.size))
+
+        apply_effects(self.board_surface, effects)
+
+        if redraw_board:
+            self.display.blit(self.board_surface, self.board_position)
+            if self.full_redraw:
+                return [self.board_background.get_rect(topleft=self.board_background_position)]
+            return [self.board_surface.get_rect(topleft=self.board_position)]
+
+        dirty += self.ball_rects + [self.paddle_rect]
+        display_rects = []
+        for rect in dirty:
+            self.display.blit(self.board_surface, (self.board_position[0] + rect.x, self.board_position[1] + rect.y), rect)
+            display_rects.append(rect.move(self.board_position))
+        return display_rects
+
+    def draw_score(self) -> list[pygame.Rect]:
+        return self.hud.draw(self.display, self.board.level, self.board.get_score(), self.board.lives, force=self.full_redraw)
+
+    def draw(self) -> list[pygame.Rect] | None:
+        # Returns the display rectangles to update, or None when the whole window has to be updated
+        effects = self.paused_effects if self.paused else self.active_effects
+        board_effects, window_effects = (effects, []) if EFFECTS_ON_BOARD else ([], effects)
+        # Window effects touch the whole frame, so they need a full redraw every frame
+        self.full_redraw = self.full_redraw or bool(window_effects)
+
+        if self.full_redraw:
+            self.display.fill(BLACK)
+        dirty = self.draw_board(board_effects) + self.draw_score()
+        if self.show_profiler:
+            dirty += self.profiler_overlay.draw(self.display, self.profiler, force=self.full_redraw)
+
+        apply_effects(self.display, window_effects)
+
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+        return dirty
+
+    def read_controls(self) -> tuple[Direction, float]:
+        # Sees the keyboard and joystick as of the last event pump
+        direction = Direction.STOP
+        speed_multiplier = 1.0
+        keys = pygame.key.get_pressed()
+        if keys[K_LEFT] and not keys[K_RIGHT]:
+            direction = Direction.LEFT
+        elif keys[K_RIGHT] and not keys[K_LEFT]:
+            direction = Direction.RIGHT
+
+        # Joystick input overrides keyboard input
+        if self.joystick is not None:
+            axis_value = self.joystick.get_axis(0)
+            if axis_value < -self.joystick_deadzone:
+                direction = Direction.LEFT
+                speed_multiplier = 0.1 + (abs(axis_value) * 0.9)
+            elif axis_value > self.joystick_deadzone:
+                direction = Direction.RIGHT
+                speed_multiplier = 0.1 + (abs(axis_value) * 0.9)
+
+        return direction, speed_multiplier
+
+    def idle(self):
+        # Keeps the controls fresh while waiting for the next frame, so changes are timestamped when they arrive
+        pygame.event.pump()
+        self.controls.poll()
+
+    def close(self):
+        self.audio_thread.join()
+        if self.recorder is not None:
+            self.recorder.close(self.board)
+        if self.profile_path is not None:
+            self.profiler.dump(self.profile_path)
+        if self.levels is not None:
+            self.levels.close()
+        pygame.quit()
+
+    def step(self) -> int | None:
+        # One fixed simulation step. Returns the sample time of the paddle intent if this step is the first to use it.
+        profiler = self.profiler
+        intent = self.controls.latest # Sampled right after this frame's events
+        input_timestamp = None
+        if intent.sequence != self.applied_input:
+            self.applied_input = intent.sequence
+            input_timestamp = intent.timestamp
+
+        speed_multiplier = intent.speed_multiplier
+        if self.recorder is not None:
+            speed_multiplier = self.recorder.record(intent.direction, speed_multiplier)
+        profiler.mark("input")
+        self.previous_balls = self.board.ball_positions()
+        self.previous_paddle = self.board.paddle.position.x
+        game_state = advance(self.board, intent.direction, self.scheduler.step, speed_multiplier)
+        profiler.mark("update")
+
+        match game_state:
+            case 0:
+                self.sequencer.play(self.game_over_sound)
+            case 1:
+                pass
+            case 2:
+                self.voices.play(self.block_hit_sound)
+            case 3:
+                self.voices.play(self.paddle_hit_sound, priority=1)
+            case -1:
+                self.sequencer.play(self.clear_level_sound)
+            case _:
+                raise ValueError(f"Invalid game state '{game_state}' returned from board update")
+        if game_state in (0, -1): # The ball and paddle were put back, there is nothing to interpolate from
+            self.previous_balls = []
+            self.previous_paddle = None
+        self.sequencer.update()
+        profiler.mark("audio")
+        return input_timestamp
 
     def run(self) -> int:
+        profiler = self.profiler
+        scheduler = self.scheduler
         while True:
+            profiler.begin_frame()
+            steps = scheduler.begin_frame()
             for event in pygame.event.get():
                 if event.type == QUIT:
-                    pygame.quit()
+                    self.close()
                     return 0
+                if event.type == JOYDEVICEADDED and self.joystick is None:
+                    self.joystick = pygame.joystick.Joystick(event.device_index)
+                if event.type == JOYDEVICEREMOVED and self.joystick is not None and event.instance_id == self.joystick.get_instance_id():
+                    self.joystick = None
                 if event.type == KEYDOWN:
                     if event.key == K_p:
                         self.paused = not self.paused
+                        self.full_redraw = True
+                    if event.key == K_F3 and self.profiler_overlay is not None:
+                        self.show_profiler = not self.show_profiler
+                        self.full_redraw = True
                     if event.key == K_r:
                         self.board.reset()
+                        self.previous_balls = []
+                        self.previous_paddle = None
+                        if self.recorder is not None:
+                            self.recorder.record_reset()
+            self.controls.update()
+            profiler.mark("events")
 
+            input_timestamp = None
             if not self.paused:
-                direction = Direction.STOP
-                keys = pygame.key.get_pressed()
-                if keys[K_LEFT] and not keys[K_RIGHT]:
-                    direction = Direction.LEFT
-                    self.paddle_speed_multiplier = 1.0
-                elif keys[K_RIGHT] and not keys[K_LEFT]:
-                    direction = Direction.RIGHT
-                    self.paddle_speed_multiplier = 1.0
-
-                # Joystick input overrides keyboard input
-                if self.joystick is not None:
-                    axis_value = self.joystick.get_axis(0)
-                    if axis_value < -self.joystick_deadzone:
-                        direction = Direction.LEFT
-                        self.paddle_speed_multiplier = 0.1 + (abs(axis_value) * 0.9)
-                    elif axis_value > self.joystick_deadzone:
-                        direction = Direction.RIGHT
-                        self.paddle_speed_multiplier = 0.1 + (abs(axis_value) * 0.9)
-
-                game_state = self.board.update(direction, 1.0 / FPS, self.paddle_speed_multiplier)
-
-                match game_state:
-                    case 0:
-                        play_sounds(self.game_over_sound)
-                    case 1:
-                        pass
-                    case 2:
-                        self.block_hit_sound.play()
-                    case 3:
-                        self.paddle_hit_sound.play()
-                    case -1:
-                        self.board.ball.max_velocity *= LEVEL_BALL_SPEED_MULTIPLIER
-                        play_sounds(self.clear_level_sound)
-                    case _:
-                        raise ValueError(f"Invalid game state '{game_state}' returned from board update")
+                for _ in range(steps):
+                    timestamp = self.step()
+                    if input_timestamp is None:
+                        input_timestamp = timestamp
+                self.alpha = scheduler.alpha
 
                 for effect in self.active_effects:
-                    effect.update(1000 / FPS)
+                    effect.update(scheduler.elapsed * 1000)
             else:
-                
+                scheduler.accumulator = 0.0 # Time spent paused is not simulated
+                self.applied_input = self.controls.latest.sequence # Input while paused is not a paddle movement
                 for effect in self.paused_effects:
-                    effect.update(1000 / FPS)
+                    effect.update(scheduler.elapsed * 1000)
+            profiler.mark("effects")
 
-            self.draw()
-            pygame.display.update()
\ No newline at end of file
+            dirty = self.draw()
+            profiler.mark("draw")
+            if dirty is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(dirty)
+            profiler.mark("present")
+            if self.startup.first_frame is None:
+                self.startup.end()
+                self.find_joysticks()
+            if self.startup_report and not self.audio_thread.is_alive(): # Wait for the background steps to be in the report
+                self.startup_report = False
+                print(self.startup.report())
+            if input_timestamp is not None: # Time from sampling a new paddle intent to showing its first movement
+                profiler.record("latency", (time.perf_counter_ns() - input_timestamp) / 1e6)
+            profiler.end_frame()
+            scheduler.wait(self.idle)
\ No newline at end of file
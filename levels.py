@@ -0,0 +1,146 @@
+# Level packs. A pack holds any number of levels, each with its own block layout, colours and ball and paddle
+# settings. Packs are memory mapped and a level is only parsed when it is needed, and `LevelLoader` builds
+# the next level on a background thread while the current one is played.
+#
+# Layout (little endian):
+#   header  "BKLV", version (u16), level count (u32)
+#   index   offset of each level from the start of the file (u64 per level)
+#   level   columns (u16), rows (u16), colours (u8), ball velocity (f64), ball max velocity (f64),
+#           paddle width in blocks (f64), paddle top speed in board widths per second (f64), paddle acceleration (f64)
+#           colours  red, green, blue (u8 each) per colour
+#           cells    one byte per cell (row-major): 0 for no block, otherwise colour index + 1
+from colours import *
+from components import Board, BlockGrid, Level
+from constants import *
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+import mmap
+import struct
+
+
+MAGIC: bytes = b"BKLV"
+VERSION: int = 1
+HEADER = struct.Struct("<4sHI")
+OFFSET = struct.Struct("<Q")
+LEVEL = struct.Struct("<HHBddddd")
+
+
+class LevelSpec(NamedTuple):
+    number_blocks: tuple[int, int]
+    colours: list[tuple[int, int, int]]
+    cells: bytes # One byte per cell, see the layout above
+    ball_velocity: float = BASE_BALL_VELOCITY
+    ball_max_velocity: float = BASE_BALL_MAX_VELOCITY
+    paddle_width: float = 3.0
+    paddle_speed: float = PADDLE_MAX_SPEED_MULTIPLIER
+    paddle_acceleration: float = PADDLE_ACCELERATION_FACTOR
+
+    @classmethod
+    def default(cls, number_blocks: tuple[int, int] = COLUMS_ROWS, colours: list[tuple[int, int, int]] = BLOCK_COLOURS) -> "LevelSpec":
+        # The standard full grid, coloured by row
+        columns, rows = number_blocks
+        cells = bytes(y % len(colours) + 1 for y in range(rows) for _ in range(columns))
+        return cls(number_blocks, colours, cells)
+
+    def pack(self) -> bytes:
+        columns, rows = self.number_blocks
+        if len(self.cells) != columns * rows:
+            raise ValueError(f"LevelSpec.pack(): expected {columns * rows} cells, got {len(self.cells)}")
+        if max(self.cells, default=0) > len(self.colours):
+            raise ValueError("LevelSpec.pack(): cell refers to a missing colour")
+        header = LEVEL.pack(columns, rows, len(self.colours), self.ball_velocity, self.ball_max_velocity, self.paddle_width, self.paddle_speed, self.paddle_acceleration)
+        return header + bytes(channel for colour in self.colours for channel in colour) + bytes(self.cells)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset: int = 0) -> "LevelSpec":
+        columns, rows, colour_count, *settings = LEVEL.unpack_from(buffer, offset)
+        offset += LEVEL.size
+        colours = [tuple(buffer[i:i + 3]) for i in range(offset, offset + 3 * colour_count, 3)]
+        offset += 3 * colour_count
+        cells = bytes(buffer[offset:offset + columns * rows])
+        return cls((columns, rows), colours, cells, *settings)
+
+
+def write_pack(path: str, levels: list[LevelSpec]):
+    data = [level.pack() for level in levels]
+    offset = HEADER.size + OFFSET.size * len(data)
+    offsets = []
+    for level in data:
+        offsets.append(offset)
+        offset += len(level)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(data)))
+        file.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        file.write(b"".join(data))
+
+
+class LevelPack:
+    # Memory-mapped level pack. Opening a pack only reads its header, and `pack[i]` parses level i alone.
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"'{path}' is not a version {VERSION} level pack")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> LevelSpec:
+        if not 0 <= index < self.count:
+            raise IndexError("LevelPack index out of range")
+        (offset,) = OFFSET.unpack_from(self.map, HEADER.size + OFFSET.size * index)
+        return LevelSpec.unpack_from(self.map, offset)
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self) -> "LevelPack":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def build_level(spec: LevelSpec, board_width: float, top_space: int = Board.top_space) -> Level:
+    block_size = board_width / spec.number_blocks[0]
+    blocks = BlockGrid(spec.number_blocks, block_size, top_space, spec.colours, spec.cells)
+    return Level(blocks, spec.ball_velocity, spec.ball_max_velocity, spec.paddle_width, spec.paddle_speed, spec.paddle_acceleration)
+
+
+class LevelLoader:
+    # Hands levels to a Board (`Board(..., levels=loader)`) and builds the one after it on a background thread,
+    # so a level transition only swaps in a finished level. Level numbers start at 1 and wrap around the pack.
+    # Level 1 is kept, since the game returns to it after every game over.
+    def __init__(self, pack: LevelPack, board_width: float = BOARD_SIZE[0], top_space: int = Board.top_space):
+        self.pack = pack
+        self.board_width = board_width
+        self.top_space = top_space
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        self.first: Level | None = None
+        self.pending: tuple[int, Future] | None = None # Level number and the build running for it
+
+    def build(self, level: int) -> Level:
+        return build_level(self.pack[(level - 1) % len(self.pack)], self.board_width, self.top_space)
+
+    def prefetch(self, level: int):
+        if self.pending is None or self.pending[0] != level:
+            self.pending = (level, self.executor.submit(self.build, level))
+
+    def get(self, level: int) -> Level:
+        if level == 1 and self.first is not None:
+            result = self.first
+        elif self.pending is not None and self.pending[0] == level:
+            result = self.pending[1].result() # Usually done long ago
+            self.pending = None
+        else:
+            result = self.build(level)
+        if level == 1:
+            self.first = result
+        self.prefetch(level + 1)
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
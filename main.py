@@ -1,8 +1,86 @@
-from game import Game
+import time
+
+STARTED = time.perf_counter_ns() # Start of the start-up time report, before anything else is imported
+
+import argparse
 
 
 def main() -> int:
-    game = Game()
+    parser = argparse.ArgumentParser(description="Breakout")
+    parser.add_argument("--headless", action="store_true", help="run the simulation without a display or audio")
+    parser.add_argument("--steps", type=int, default=100_000, help="number of steps to simulate in headless mode")
+    parser.add_argument("--policy", choices=("follow", "intercept", "random"), default="follow", help="paddle policy in headless mode")
+    parser.add_argument("--delta-time", type=float, default=None, help="seconds simulated per step in headless mode (default: one frame)")
+    parser.add_argument("--swept", action="store_true", help="use swept collision detection, which stays correct at large timesteps")
+    parser.add_argument("--balls", type=int, default=1, help="start with this many balls (multi-ball mode)")
+    parser.add_argument("--levels", metavar="PATH", default=None, help="play the levels of a level pack")
+    parser.add_argument("--seed", type=int, default=None, help="seed the board's random number generator")
+    parser.add_argument("--record", metavar="PATH", default=None, help="record the game's inputs to a replayable log")
+    parser.add_argument("--frame-cap", type=int, default=None, help="maximum frames per second, 0 for uncapped (default: the display's refresh rate)")
+    parser.add_argument("--no-effects", dest="effects", action="store_false", help="turn off the video effects")
+    parser.add_argument("--profile", action="store_true", help="time each phase of every frame and show the timings next to the HUD (F3 toggles)")
+    parser.add_argument("--profile-output", metavar="PATH", default=None, help="write the frame timings to a JSON file on exit (implies --profile)")
+    parser.add_argument("--startup-report", action="store_true", help="print how long each step of start-up took once the first frame is on screen")
+    parser.add_argument("--replay", metavar="PATH", default=None, help="re-run a recorded log headlessly and check its final state")
+    args = parser.parse_args()
+    if args.balls > 1 and (args.swept or args.record is not None or args.replay is not None):
+        parser.error("--balls cannot be combined with --swept, --record or --replay")
+    if args.levels is not None and (args.record is not None or args.replay is not None):
+        parser.error("--levels cannot be combined with --record or --replay")
+
+    if args.replay is not None:
+        import replay
+
+        try:
+            board, stats = replay.replay(args.replay)
+        except replay.ReplayMismatch as error:
+            print(error)
+            return 1
+        print(f"Replay matches: level {board.level}, score {board.get_score()}, lives {board.lives}")
+        for key, value in stats.items():
+            print(f"{key}: {value:,.2f}" if isinstance(value, float) else f"{key}: {value}")
+        return 0
+
+    if args.headless:
+        # Imported lazily so headless runs never load pygame
+        import random
+        import sim
+
+        delta_time = args.delta_time if args.delta_time is not None else 1.0 / sim.FPS
+        board = None
+        levels = None
+        if args.levels is not None:
+            from levels import LevelLoader, LevelPack
+
+            levels = LevelLoader(LevelPack(args.levels))
+            board = sim.Board(sim.BOARD_SIZE, sim.COLUMS_ROWS, swept=args.swept, seed=args.seed, levels=levels)
+        if args.balls > 1:
+            from multi_ball import MultiBallBoard
+
+            board = MultiBallBoard(sim.BOARD_SIZE, sim.COLUMS_ROWS, seed=args.seed, levels=levels, balls=args.balls)
+        recorder = None
+        seed = args.seed
+        if args.record is not None:
+            from replay import InputRecorder
+
+            seed = seed if seed is not None else random.getrandbits(63) # Recordings need a known seed to be replayable
+            recorder = InputRecorder(args.record, seed, delta_time, sim.COLUMS_ROWS, args.swept)
+        if board is None:
+            board = sim.Board(sim.BOARD_SIZE, sim.COLUMS_ROWS, swept=args.swept, seed=seed)
+        policies = {"follow": sim.follow_ball, "intercept": sim.intercept}
+        policy = policies[args.policy] if args.policy in policies else sim.random_policy(random.Random(seed))
+        stats = sim.run(args.steps, policy, board, delta_time=delta_time, recorder=recorder)
+        if recorder is not None:
+            recorder.close(board)
+        for key, value in stats.items():
+            print(f"{key}: {value:,.2f}" if isinstance(value, float) else f"{key}: {value}")
+        return 0
+
+    from game import Game
+    from profiler import StartupProfiler
+
+    startup = StartupProfiler(STARTED) if args.startup_report else None
+    game = Game(args.seed, args.record, args.profile, args.profile_output, args.balls, args.levels, args.frame_cap, startup, args.effects)
     return game.run()
 
 if __name__ == "__main__":
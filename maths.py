@@ -180,4 +180,112 @@ class Vector(Generic[T]):
     def norm(self, p: float = 2.0) -> float:
         if p == float("inf"):
             return max(abs(c) for c in self.components)
-        return sum(c ** p for c in self.components) ** (1 / p)
\ No newline at end of file
+        return sum(c ** p for c in self.components) ** (1 / p)
+
+
+class Vec2:
+    # Compact mutable 2D vector for the physics hot path.
+    # Supports the same indexing/iteration as Vector, plus in-place updates that avoid allocating.
+    __slots__ = ("x", "y")
+
+    x: float
+    y: float
+
+    def __init__(self, x: float = 0.0, y: float = 0.0) -> None:
+        self.x = x
+        self.y = y
+
+    def set(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+    def add_scaled(self, other: Vec2, scalar: float) -> None:
+        # self += other * scalar, in place
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+
+    def __add__(self, other: Vec2) -> Vec2:
+        return Vec2(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other: Vec2) -> Vec2:
+        return Vec2(self.x - other.x, self.y - other.y)
+
+    def __iadd__(self, other: Vec2) -> Vec2:
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other: Vec2) -> Vec2:
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __mul__(self, other: Vec2 | float) -> Any:
+        if isinstance(other, Vec2):
+            # Dot Product
+            return self.x * other.x + self.y * other.y
+        # Scalar Multiplication
+        return Vec2(self.x * other, self.y * other)
+
+    def __rmul__(self, scalar: float) -> Vec2:
+        return Vec2(scalar * self.x, scalar * self.y)
+
+    def __imul__(self, scalar: float) -> Vec2:
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __truediv__(self, scalar: float) -> Vec2:
+        return Vec2(self.x / scalar, self.y / scalar)
+
+    def __neg__(self) -> Vec2:
+        return Vec2(-self.x, -self.y)
+
+    def __abs__(self) -> Vec2:
+        return Vec2(abs(self.x), abs(self.y))
+
+    def __getitem__(self, key: int) -> float:
+        if key == 0 or key == -2:
+            return self.x
+        if key == 1 or key == -1:
+            return self.y
+        raise IndexError("Vec2 index out of range")
+
+    def __iter__(self) -> Iterable[float]:
+        yield self.x
+        yield self.y
+
+    def __len__(self) -> int:
+        return 2
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Vec2):
+            return self.x == other.x and self.y == other.y
+        if isinstance(other, Vector):
+            return (self.x, self.y) == other.components
+        return False
+
+    __hash__ = None # Mutable
+
+    def __bool__(self) -> bool:
+        return bool(self.x or self.y)
+
+    def __str__(self):
+        return str((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vec2({self.x}, {self.y})"
+
+    def __copy__(self) -> Vec2:
+        return Vec2(self.x, self.y)
+
+    def __deepcopy__(self, _: dict[int, Any]) -> Vec2:
+        return Vec2(self.x, self.y)
+
+    def copy(self) -> Vec2:
+        return Vec2(self.x, self.y)
+
+    def norm(self, p: float = 2.0) -> float:
+        if p == float("inf"):
+            return max(abs(self.x), abs(self.y))
+        return (abs(self.x) ** p + abs(self.y) ** p) ** (1 / p)
@@ -0,0 +1,247 @@
+# Many balls on one board, stored in NumPy arrays and stepped together
+from colours import BLOCK_COLOURS
+from components import WALL_LEFT, WALL_RIGHT, WALL_TOP, Board, BoardState, Direction, Event, Level
+from constants import *
+
+from typing import NamedTuple
+import math
+import numpy as np
+
+
+class MultiBallState(NamedTuple):
+    board: BoardState
+    balls: np.ndarray # (count, 5): x, y, velocity x, velocity y, max velocity
+
+
+class MultiBallBoard(Board):
+    # A board with any number of balls. Every step moves all balls at once, then resolves the walls,
+    # the paddle and the blocks for all of them in one pass. The block grid doubles as the broad phase:
+    # each ball only tests the few cells around it, so a step costs O(balls) rather than O(balls * blocks).
+    # Balls that fall out are removed and a life is lost with the last one. Every new life and level
+    # starts with `balls` balls again.
+    # `ball` mirrors the first ball, so code written for a single ball keeps working.
+    count: int
+    balls: int # Balls each life and level starts with
+    position: np.ndarray # (capacity, 2) centres
+    velocity: np.ndarray # (capacity, 2)
+    max_velocity: np.ndarray # (capacity,)
+
+    def __init__(self, bounds: tuple[float, float], number_blocks: tuple[int, int] = COLUMS_ROWS, block_colours: list[tuple[int, int, int]] = BLOCK_COLOURS, level: int = 1, score: int = 0, lives: int = LIVES, seed: int | None = None, levels: object | None = None, balls: int = 1, capacity: int = 256):
+        super().__init__(bounds, number_blocks, block_colours, level, score, lives, seed=seed, levels=levels)
+        self.balls = balls
+
+        self.position = np.empty((capacity, 2), dtype=np.float64)
+        self.velocity = np.empty((capacity, 2), dtype=np.float64)
+        self.max_velocity = np.empty(capacity, dtype=np.float64)
+        self.count = 0
+
+        self.update_geometry()
+        self.load_ball()
+
+    def update_geometry(self):
+        # Block positions, one entry per cell in the same order as `BlockGrid.blocks`
+        columns, rows = self.number_blocks
+        block_size = self.blocks.block_size
+        self.block_x = np.tile(np.arange(columns, dtype=np.float64) * block_size, rows)
+        self.block_y = np.repeat(np.arange(self.top_space, rows + self.top_space, dtype=np.float64) * block_size, columns)
+        # Candidate cells per axis around a ball, the same range `BlockGrid.query` looks at
+        self.offsets = np.arange(int(math.floor(2 * self.ball.radius / block_size)) + 3)
+
+    def apply_level(self, level: Level):
+        super().apply_level(level)
+        self.update_geometry()
+
+    def reserve(self, capacity: int):
+        if capacity <= len(self.max_velocity):
+            return
+        capacity = max(capacity, 2 * len(self.max_velocity))
+        for name in ("position", "velocity", "max_velocity"):
+            old = getattr(self, name)
+            new = np.empty((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def load_ball(self):
+        # Replaces all balls with `ball`, after the base class has respawned or reset it, and spawns the rest
+        ball = self.ball
+        self.count = 1
+        self.position[0] = ball.position.x, ball.position.y
+        self.velocity[0] = ball.velocity.x, ball.velocity.y
+        self.max_velocity[0] = ball.max_velocity
+        self.spawn(self.balls - 1)
+
+    def sync_ball(self):
+        ball = self.ball
+        x, y = self.position[0].tolist()
+        velocity_x, velocity_y = self.velocity[0].tolist()
+        ball.position.set(x, y)
+        ball.velocity.set(velocity_x, velocity_y)
+        ball.max_velocity = float(self.max_velocity[0])
+
+    def spawn(self, count: int, speed: float | None = None):
+        # Launches `count` balls upwards from just above the paddle, fanned out evenly over 120 degrees.
+        # They move at the speed of the first ball unless `speed` is given.
+        if count <= 0:
+            return
+        if speed is None:
+            speed = math.hypot(*self.velocity[0].tolist())
+        start = self.count
+        end = start + count
+        self.reserve(end)
+
+        paddle = self.paddle
+        angles = np.linspace(-math.pi / 3, math.pi / 3, count) if count > 1 else np.zeros(1)
+        self.position[start:end] = paddle.position.x + paddle.size[0] / 2, paddle.position.y - self.ball.radius - 1
+        self.velocity[start:end, 0] = speed * np.sin(angles)
+        self.velocity[start:end, 1] = -speed * np.cos(angles)
+        self.max_velocity[start:end] = self.max_velocity[0]
+        self.count = end
+
+    def ball_positions(self) -> list[tuple[float, float]]:
+        return self.position[:self.count].tolist()
+
+    def speed_up(self, factor: float):
+        self.max_velocity[:self.count] *= factor
+        self.ball.max_velocity *= factor
+
+    def _bounce(self, velocity: np.ndarray, max_velocity: np.ndarray, mask: np.ndarray):
+        # Vectorised `Ball.bounce_x`/`Ball.bounce_y` on one velocity component
+        component = velocity[mask]
+        velocity[mask] = -np.minimum(max_velocity[mask], np.abs(component)) * np.where(component > 0, 1.0, -1.0)
+
+    def _find_block_hits(self, balls: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Returns the balls that hit a block and the first block (in row-major order) each of them hit,
+        # testing only the cells around each ball
+        if not balls.size:
+            return balls, balls
+        columns, rows = self.number_blocks
+        block_size = self.blocks.block_size
+        radius = self.ball.radius
+        x = self.position[balls, 0]
+        y = self.position[balls, 1]
+
+        cell_x = np.floor((x - radius) / block_size).astype(np.int64) - 1
+        cell_y = np.floor((y - radius) / block_size).astype(np.int64) - 1 - self.top_space
+        cell_columns = cell_x[:, None, None] + self.offsets[None, None, :]
+        cell_rows = cell_y[:, None, None] + self.offsets[None, :, None]
+        valid = (cell_columns >= 0) & (cell_columns < columns) & (cell_rows >= 0) & (cell_rows < rows)
+        index = np.where(valid, cell_rows * columns + cell_columns, 0).reshape(len(balls), -1)
+        valid = valid.reshape(len(balls), -1)
+
+        alive = np.frombuffer(self.blocks.alive, dtype=np.uint8)
+        block_x = self.block_x[index]
+        block_y = self.block_y[index]
+        hit = valid & (alive[index] != 0) & \
+              (x[:, None] + radius >= block_x) & \
+              (x[:, None] - radius <= block_x + block_size) & \
+              (y[:, None] + radius >= block_y) & \
+              (y[:, None] - radius <= block_y + block_size)
+
+        any_hit = hit.any(axis=1)
+        first = index[np.arange(len(balls)), hit.argmax(axis=1)]
+        return balls[any_hit], first[any_hit]
+
+    def update(self, paddle_direction: Direction, delta_time: float, paddle_speed_multiplier: float = 1.0) -> int:
+        # Same rules and return codes as `Board.update`, applied to every ball.
+        # When several things happen in one step, the most important one is returned (-1, 0, 2, 3, 1).
+        radius = self.ball.radius
+        paddle = self.paddle
+        count = self.count
+        position = self.position[:count]
+        velocity = self.velocity[:count]
+        max_velocity = self.max_velocity[:count]
+
+        position += velocity * delta_time
+        paddle.update(paddle_direction, delta_time, paddle_speed_multiplier)
+
+        # Bottom Wall
+        fallen = position[:, 1] - radius >= self.bounds[1]
+        if fallen.any():
+            kept = ~fallen
+            count = int(np.count_nonzero(kept))
+            if not count: # Last ball lost
+                state = self.lose_life()
+                self.load_ball()
+                return state
+            position[:count] = position[kept]
+            velocity[:count] = velocity[kept]
+            max_velocity[:count] = max_velocity[kept]
+            self.count = count
+            position = self.position[:count]
+            velocity = self.velocity[:count]
+            max_velocity = self.max_velocity[:count]
+
+        # Left/Right Walls
+        x = position[:, 0]
+        side = (x - radius <= 0) | (x + radius >= self.bounds[0])
+        if side.any():
+            self._bounce(velocity[:, 0], max_velocity, side)
+            # Push balls out of the wall to prevent sticking
+            x[side] = np.where(velocity[side, 0] > 0, radius, self.bounds[0] - radius)
+            if self.events is not None:
+                for moving_right in (velocity[side, 0] > 0).tolist():
+                    self.events.add(Event.WALL_BOUNCE, WALL_LEFT if moving_right else WALL_RIGHT)
+
+        # Top Wall
+        top = position[:, 1] - radius <= 0
+        if top.any():
+            self._bounce(velocity[:, 1], max_velocity, top)
+            position[top, 1] = radius
+            if self.events is not None:
+                for _ in range(int(np.count_nonzero(top))):
+                    self.events.add(Event.WALL_BOUNCE, WALL_TOP)
+
+        # Paddle Collision
+        paddle_x = paddle.position.x
+        bounced = (position[:, 1] + radius >= paddle.position.y) & (x >= paddle_x) & (x <= paddle_x + paddle.size[0])
+        paddle_hit = bool(bounced.any())
+        if paddle_hit:
+            hit_velocity = velocity[bounced]
+            speed = np.hypot(hit_velocity[:, 0], hit_velocity[:, 1])
+            relative_intersect = (x[bounced] - paddle_x) / paddle.size[0]
+            bounce_angle = (relative_intersect - 0.5) * 2.0
+            if self.events is not None:
+                for ball, relative in zip(np.flatnonzero(bounced).tolist(), relative_intersect.tolist()):
+                    self.events.add(Event.PADDLE_HIT, ball, relative)
+            velocity[bounced, 0] = speed * bounce_angle * 1.5
+            velocity[bounced, 1] = -(speed * (1 - np.abs(bounce_angle) * 0.5))
+
+        # Block Collisions
+        candidates = ~bounced & (position[:, 1] - radius <= self.block_area)
+        balls, hit_blocks = self._find_block_hits(np.flatnonzero(candidates))
+        self.sync_ball()
+        if balls.size:
+            # Balls hitting the same block all bounce off it, but it only counts once
+            for index in np.unique(hit_blocks).tolist():
+                self.blocks.remove(self.blocks.blocks[index])
+                self.score += 1
+                if self.events is not None:
+                    self.events.add(Event.BLOCK_DESTROYED, index)
+            hit = np.zeros(count, dtype=bool)
+            hit[balls] = True
+            self._bounce(velocity[:, 1], max_velocity, hit)
+            self.sync_ball()
+            return 2
+        if candidates.any() and not self.blocks: # All blocks destroyed
+            self.clear_level()
+            return -1
+
+        return 3 if paddle_hit else 1
+
+    def reset(self, level_up: bool = False, score: int = 0, lives: int = 0):
+        super().reset(level_up, score, lives)
+        self.load_ball()
+
+    def snapshot(self) -> MultiBallState:
+        count = self.count
+        balls = np.column_stack((self.position[:count], self.velocity[:count], self.max_velocity[:count]))
+        return MultiBallState(super().snapshot(), balls)
+
+    def restore(self, state: MultiBallState):
+        super().restore(state.board)
+        count = len(state.balls)
+        self.reserve(count)
+        self.position[:count] = state.balls[:, 0:2]
+        self.velocity[:count] = state.balls[:, 2:4]
+        self.max_velocity[:count] = state.balls[:, 4]
+        self.count = count
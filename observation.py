@@ -0,0 +1,24 @@
+# Flat numeric observation of a Board, shared by the rollout runner and other consumers
+from components import Board
+
+import numpy as np
+
+
+OBSERVATION_FEATURES: int = 6 # Ball x, y, velocity x, velocity y, paddle x, paddle velocity x
+
+
+def observation_size(number_blocks: tuple[int, int]) -> int:
+    # Features followed by the block alive mask (row-major, 1 = block present)
+    return OBSERVATION_FEATURES + number_blocks[0] * number_blocks[1]
+
+
+def write_observation(board: Board, out: np.ndarray):
+    ball = board.ball
+    paddle = board.paddle
+    out[0] = ball.position.x
+    out[1] = ball.position.y
+    out[2] = ball.velocity.x
+    out[3] = ball.velocity.y
+    out[4] = paddle.position.x
+    out[5] = paddle.velocity.x
+    out[OBSERVATION_FEATURES:] = np.frombuffer(board.blocks.alive, dtype=np.uint8)
@@ -0,0 +1,67 @@
+# Frame pacing. The simulation advances in fixed steps taken from an accumulator of real time, while frames are
+# rendered at a capped rate in between and interpolate the ball and paddle between the last two steps.
+# Game speed is then the same on every machine, and the loop sleeps instead of spinning a core.
+from constants import *
+
+from typing import Callable
+import time
+
+
+class FrameScheduler:
+    step: float # Seconds of simulation per step
+    frame_interval: float # Seconds per frame, 0 for no cap
+    accumulator: float # Real time not yet simulated
+
+    def __init__(self, step: float = 1.0 / FPS, frame_cap: float = FPS, max_steps: int = MAX_STEPS_PER_FRAME, spin: float = 0.001):
+        self.step = step
+        self.frame_interval = 1.0 / frame_cap if frame_cap > 0 else 0.0
+        self.max_steps = max_steps # Slow frames drop time beyond this instead of spiralling into ever longer frames
+        self.spin = spin # Seconds before a deadline to stop sleeping, since sleep is not precise enough
+        self.accumulator = 0.0
+        self.previous = time.perf_counter()
+        self.deadline = self.previous
+        self.elapsed = 0.0
+
+    def begin_frame(self) -> int:
+        # Returns the number of simulation steps to run this frame
+        now = time.perf_counter()
+        self.elapsed = now - self.previous
+        self.previous = now
+        self.accumulator += self.elapsed
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        # How far the renderer is between the last two simulation steps, from 0 to 1
+        return min(self.accumulator / self.step, 1.0)
+
+    def wait(self, idle: Callable[[], object] | None = None):
+        # Waits for the next frame deadline. Deadlines follow a fixed grid so frames stay evenly spaced
+        # (which is what a vsynced display wants), and `idle` is called while spinning, for example to pump events.
+        if not self.frame_interval:
+            return
+        self.deadline += self.frame_interval
+        now = time.perf_counter()
+        if now >= self.deadline: # Late, start a new grid rather than rushing to catch up
+            self.deadline = now
+            return
+        if self.deadline - now > self.spin:
+            time.sleep(self.deadline - now - self.spin)
+        while time.perf_counter() < self.deadline:
+            if idle is not None:
+                idle()
+
+
+def refresh_rate(default: int = FPS) -> int:
+    # The display's refresh rate where pygame can tell, otherwise `default`
+    import pygame
+
+    get_rate = getattr(pygame.display, "get_current_refresh_rate", None)
+    rate = get_rate() if get_rate is not None else 0
+    return rate if rate > 0 else default
@@ -0,0 +1,170 @@
+# Opt-in frame timing. Each frame is split into phases by calling `mark` at the end of every phase,
+# and the durations (in milliseconds) are kept in fixed-size ring buffers, so memory use and cost stay flat.
+# Every phase gets exactly one sample per frame: its total time in that frame, 0 if it did not run.
+from constants import *
+
+import array
+import json
+import time
+
+
+PHASES: tuple[str, ...] = ("events", "input", "update", "audio", "effects", "draw", "present")
+FRAME: str = "frame" # Whole frame, from `begin_frame` to `end_frame`
+
+
+class RingBuffer:
+    # Fixed-size buffer of floats that overwrites its oldest samples once full
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.samples = array.array("d", bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def append(self, value: float):
+        self.samples[self.index] = value
+        self.index += 1
+        if self.index == self.capacity:
+            self.index = 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self) -> list[float]:
+        # Oldest first
+        if self.count < self.capacity:
+            return self.samples[:self.count].tolist()
+        return self.samples[self.index:].tolist() + self.samples[:self.index].tolist()
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    # Nearest-rank percentile of already sorted values
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered) - 1, max(0, int(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def histogram(values: list[float], bins: int = 20) -> tuple[list[float], list[int]]:
+    # Bin edges (bins + 1) from 0 to the largest value, and the number of values per bin
+    top = max(values, default=0.0) or 1.0
+    width = top / bins
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int(value / width))] += 1
+    return [i * width for i in range(bins + 1)], counts
+
+
+class FrameProfiler:
+    def __init__(self, phases: tuple[str, ...] = PHASES, capacity: int = FPS * 10):
+        self.clock = time.perf_counter_ns
+        self.phases = phases
+        self.buffers = {phase: RingBuffer(capacity) for phase in (*phases, FRAME)}
+        self.current = dict.fromkeys(phases, 0.0) # Milliseconds spent in each phase so far this frame
+        self.frames = 0
+        self.frame_start = self.last = self.clock()
+
+    def begin_frame(self):
+        self.frame_start = self.last = self.clock()
+        self.current = dict.fromkeys(self.phases, 0.0)
+
+    def mark(self, phase: str):
+        # Ends `phase`, which started at the previous mark (or the start of the frame). Phases that run once per
+        # simulation step are marked several times in a frame that catches up, and add up.
+        now = self.clock()
+        self.current[phase] += (now - self.last) / 1e6
+        self.last = now
+
+    def end_frame(self):
+        for phase, milliseconds in self.current.items():
+            self.buffers[phase].append(milliseconds)
+        self.buffers[FRAME].append((self.clock() - self.frame_start) / 1e6)
+        self.frames += 1
+
+    def record(self, series: str, milliseconds: float):
+        # Any other timing worth tracking next to the phases, like input latency
+        buffer = self.buffers.get(series)
+        if buffer is None:
+            buffer = self.buffers[series] = RingBuffer(self.buffers[FRAME].capacity)
+        buffer.append(milliseconds)
+
+    def percentiles(self, phase: str, qs: tuple[float, ...] = (50, 95, 99)) -> tuple[float, ...]:
+        ordered = sorted(self.buffers[phase].values())
+        return tuple(percentile(ordered, q) for q in qs)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for phase, buffer in self.buffers.items():
+            values = buffer.values()
+            ordered = sorted(values)
+            result[phase] = {
+                "samples": len(values),
+                "mean": sum(values) / len(values) if values else 0.0,
+                "max": ordered[-1] if ordered else 0.0,
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+            }
+        return result
+
+    def dump(self, path: str, bins: int = 20):
+        # Writes the summary, a histogram per phase and the raw samples (milliseconds, oldest first) as JSON
+        samples = {phase: buffer.values() for phase, buffer in self.buffers.items()}
+        histograms = {}
+        for phase, values in samples.items():
+            edges, counts = histogram(values, bins)
+            histograms[phase] = {"edges": edges, "counts": counts}
+        with open(path, "w") as file:
+            json.dump({"frames": self.frames, "unit": "ms", "summary": self.summary(), "histograms": histograms, "samples": samples}, file, indent=1)
+
+
+class NullProfiler:
+    # Stands in for `FrameProfiler` when profiling is off
+    frames = 0
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase: str):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def record(self, series: str, milliseconds: float):
+        pass
+
+
+class StartupProfiler:
+    # Time to first frame, split into the steps of start-up. Steps on the main thread are timed with `mark`,
+    # like frame phases. Work moved to other threads overlaps them, so it is recorded separately with `record`.
+    def __init__(self, start: int | None = None):
+        self.clock = time.perf_counter_ns
+        self.start = self.last = start if start is not None else self.clock() # perf_counter_ns() start-up began at
+        self.steps: list[tuple[str, float]] = [] # Name and milliseconds, in order
+        self.background: list[tuple[str, float, float]] = [] # Name, milliseconds after start and duration
+        self.first_frame: float | None = None # Milliseconds from start to the first frame on screen
+
+    def mark(self, step: str):
+        # Ends `step`, which started at the previous mark
+        now = self.clock()
+        self.steps.append((step, (now - self.last) / 1e6))
+        self.last = now
+
+    def record(self, step: str, started: int, ended: int):
+        self.background.append((step, (started - self.start) / 1e6, (ended - started) / 1e6))
+
+    def end(self):
+        # Called once the first frame is presented
+        self.mark("first frame")
+        self.first_frame = (self.last - self.start) / 1e6
+
+    def report(self) -> str:
+        width = max(len("time to first frame"), *(len(name) for name, *_ in self.steps + self.background))
+        lines = [f"{name:<{width}} {ms:8.1f} ms" for name, ms in self.steps]
+        if self.first_frame is not None:
+            lines.append(f"{'time to first frame':<{width}} {self.first_frame:8.1f} ms")
+        for name, started, ms in self.background:
+            lines.append(f"{name:<{width}} {ms:8.1f} ms (background, from {started:.1f} ms)")
+        return "\n".join(lines)
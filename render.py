@@ -0,0 +1,212 @@
+# Offline rendering of recorded games (see replay.py) to PNG frame sequences and GIFs, faster than real time.
+# A quick headless pass over the log takes a Board.snapshot at the start of every segment, then worker processes
+# restore those snapshots and each re-simulate and draw their own segment through Game.draw, without a display.
+from components import Board, BoardState
+from constants import *
+from replay import DIRECTIONS, FRAME, NO_STEP_FLAG, RESET_FLAG, InputLog, read_log
+from sim import advance
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+import argparse
+import numpy as np
+import os
+import struct
+import time
+import zlib
+
+
+FRAME_NAME: str = "frame_{:06d}.png" # Numbered from 0 within the rendered range
+PNG_COMPRESSION: int = 1 # zlib level. Game frames are mostly flat colour, so higher levels cost a lot more time than they save space.
+
+
+class Segment(NamedTuple):
+    start: int # First log entry to play
+    end: int # Log entry to stop before
+    step: int # Steps simulated before `start`
+    state: BoardState # Board before `start`
+
+
+class RenderSettings(NamedTuple):
+    output: str # Directory the frames are written to
+    first_step: int # Step the rendered range starts after
+    every: int # Steps per frame
+    effects: bool # Run the video effects on the frames
+    scale: float
+
+
+def count_steps(log: InputLog) -> int:
+    return sum(1 for flags, _ in FRAME.iter_unpack(log.frames) if not flags & NO_STEP_FLAG)
+
+
+def plan_segments(log: InputLog, count: int, first_step: int = 0, last_step: int | None = None) -> list[Segment]:
+    # Splits steps first_step + 1 .. last_step into `count` runs of about the same length.
+    # Plays the log headlessly once, which takes about a second for an hour of play.
+    total = count_steps(log)
+    last_step = total if last_step is None else min(last_step, total)
+    first_step = min(first_step, last_step)
+    boundaries = sorted({first_step + (last_step - first_step) * i // count for i in range(count)})
+
+    board = Board(BOARD_SIZE, log.number_blocks, swept=log.swept, seed=log.seed)
+    starts: list[tuple[int, int, BoardState]] = [] # Entry, step and board at every boundary
+    step = 0
+    entry = 0
+    for entry, (flags, speed_multiplier) in enumerate(FRAME.iter_unpack(log.frames)):
+        if len(starts) < len(boundaries) and step == boundaries[len(starts)]:
+            starts.append((entry, step, board.snapshot()))
+        if step == last_step:
+            break
+        if flags & RESET_FLAG:
+            board.reset()
+        if flags & NO_STEP_FLAG:
+            continue
+        advance(board, DIRECTIONS[(flags & 0b11) - 1], log.delta_time, speed_multiplier)
+        step += 1
+    else:
+        entry = len(log.frames) // FRAME.size
+        if len(starts) < len(boundaries) and step == boundaries[len(starts)]:
+            starts.append((entry, step, board.snapshot()))
+
+    ends = [start[0] for start in starts[1:]] + [entry]
+    return [Segment(start, end, step, state) for (start, step, state), end in zip(starts, ends) if end > start]
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(pixels: bytes, size: tuple[int, int], path: str, level: int = PNG_COMPRESSION):
+    # Writes 8-bit RGB pixels (rows top to bottom) as a PNG. About three times faster than pygame.image.save,
+    # which spends most of its time compressing harder.
+    width, height = size
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8) # Each row starts with filter type 0 (none)
+    rows[:, 1:] = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0) # 8 bits per channel, RGB, no interlacing
+    with open(path, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)) + png_chunk(b"IEND", b""))
+
+
+_game = None # The worker's Game, built by the first segment it renders
+
+
+def render_segment(path: str, segment: Segment, settings: RenderSettings) -> list[str]:
+    # Runs in a worker process. Returns the paths of the frames written, in order.
+    global _game
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from components import EventBuffer
+    from game import Game
+    from video.effects import ColourShiftEffect, ScanlineEffect
+
+    import pygame
+
+    log = read_log(path)
+    if _game is None:
+        _game = Game(log.seed, frame_cap=0)
+    game = _game
+    board = Board(BOARD_SIZE, log.number_blocks, swept=log.swept, seed=log.seed)
+    board.events = EventBuffer()
+    board.restore(segment.state)
+    game.board = board
+    game.previous_balls = []
+    game.previous_paddle = None
+    game.full_redraw = True
+    game.active_effects = [ColourShiftEffect(), ScanlineEffect()] if settings.effects else []
+    size = (round(WINDOW_SIZE[0] * settings.scale), round(WINDOW_SIZE[1] * settings.scale))
+
+    paths = []
+    step = segment.step
+    for flags, speed_multiplier in FRAME.iter_unpack(log.frames[segment.start * FRAME.size:segment.end * FRAME.size]):
+        if flags & RESET_FLAG:
+            board.reset()
+        if flags & NO_STEP_FLAG:
+            continue
+        advance(board, DIRECTIONS[(flags & 0b11) - 1], log.delta_time, speed_multiplier)
+        step += 1
+        if (step - settings.first_step) % settings.every:
+            continue
+
+        for effect in game.active_effects: # Effects depend only on the time, so every segment gets the same frames
+            effect.elapsed_time = step * log.delta_time * 1000
+        game.draw()
+        frame = game.display if settings.scale == 1.0 else pygame.transform.smoothscale(game.display, size)
+        paths.append(os.path.join(settings.output, FRAME_NAME.format((step - settings.first_step) // settings.every - 1)))
+        write_png(pygame.image.tobytes(frame, "RGB"), frame.get_size(), paths[-1])
+    return paths
+
+
+def write_gif(frames: list[str], path: str, frame_duration: float):
+    # Needs Pillow. `frame_duration` is in seconds, GIFs store it in hundredths of a second.
+    from PIL import Image
+
+    images = (Image.open(frame) for frame in frames[1:])
+    with Image.open(frames[0]) as first:
+        first.save(path, save_all=True, append_images=images, duration=round(frame_duration * 1000), loop=0, optimize=False)
+
+
+def render(path: str, output: str, workers: int | None = None, every: int = 1, start: float = 0.0, end: float | None = None, effects: bool = False, scale: float = 1.0, gif: str | None = None) -> dict[str, float]:
+    # Renders the part of a log from `start` to `end` (seconds of play) to `output`, one frame every `every` steps
+    if gif is not None:
+        try:
+            import PIL # Fail before rendering, not after
+        except ImportError:
+            raise RuntimeError("Writing GIFs needs Pillow (pip install pillow)") from None
+    log = read_log(path)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output, exist_ok=True)
+
+    started = time.perf_counter()
+    total = count_steps(log)
+    last_step = min(int(end / log.delta_time), total) if end is not None else total
+    first_step = min(int(start / log.delta_time), last_step)
+    # More segments than workers, so a worker that finishes early picks up another one
+    segments = plan_segments(log, workers * 4, first_step, last_step)
+    planned = time.perf_counter()
+
+    settings = RenderSettings(output, first_step, every, effects, scale)
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(render_segment, path, segment, settings) for segment in segments]
+        frames = [frame for future in futures for frame in future.result()]
+    rendered = time.perf_counter()
+
+    if gif is not None and frames:
+        write_gif(frames, gif, log.delta_time * every)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "frames": len(frames),
+        "segments": len(segments),
+        "workers": workers,
+        "planning_seconds": planned - started,
+        "rendering_seconds": rendered - planned,
+        "seconds": elapsed,
+        "frames_per_second": len(frames) / elapsed if elapsed > 0 else float("inf"),
+        "real_time_factor": (last_step - first_step) * log.delta_time / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render a recorded game (see --record) to PNG frames and optionally a GIF")
+    parser.add_argument("log", help="input log written by --record")
+    parser.add_argument("output", help="directory for the PNG frames")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--every", type=int, default=1, help="render one frame every N simulation steps")
+    parser.add_argument("--from", dest="start", type=float, default=0.0, help="start of the clip in seconds of play")
+    parser.add_argument("--to", dest="end", type=float, default=None, help="end of the clip in seconds of play")
+    parser.add_argument("--effects", action="store_true", help="run the video effects on every frame")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale the frames by this factor")
+    parser.add_argument("--gif", metavar="PATH", default=None, help="also write the frames to an animated GIF (needs Pillow)")
+    args = parser.parse_args()
+
+    try:
+        stats = render(args.log, args.output, args.workers, args.every, args.start, args.end, args.effects, args.scale, args.gif)
+    except RuntimeError as error:
+        print(error)
+        return 1
+    for key, value in stats.items():
+        print(f"{key}: {value:,.2f}" if isinstance(value, float) else f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,120 @@
+# Compact binary input logs. Recording a seeded game's inputs is enough to re-run it exactly, headlessly.
+#
+# Layout (little endian):
+#   header  "BKRL", version (u16), seed (i64), delta time (f64), columns (u16), rows (u16), swept (u8)
+#   frames  flags (u8), paddle speed multiplier (f16), 3 bytes per frame
+#           flags: bits 0-1 direction + 1, bit 2 reset the board, bit 3 no step (reset only)
+#   end     END_MARKER (u8), level (i32), score (i64), lives (i32), blocks left (i32), ball x (f64), ball y (f64)
+from components import Board, Direction
+from constants import *
+from sim import advance
+
+from typing import BinaryIO, NamedTuple
+import struct
+import time
+
+
+MAGIC: bytes = b"BKRL"
+VERSION: int = 1
+HEADER = struct.Struct("<4sHqdHHB")
+FRAME = struct.Struct("<Be")
+END = struct.Struct("<iqiidd")
+END_MARKER: int = 0xFF
+
+RESET_FLAG: int = 0b0100
+NO_STEP_FLAG: int = 0b1000
+
+DIRECTIONS: dict[int, Direction] = {direction.value: direction for direction in Direction}
+
+
+class ReplayMismatch(Exception):
+    pass
+
+
+class FinalState(NamedTuple):
+    level: int
+    score: int
+    lives: int
+    blocks: int
+    ball_x: float
+    ball_y: float
+
+    @classmethod
+    def of(cls, board: Board) -> "FinalState":
+        return cls(board.level, board.score, board.lives, board.blocks.count, board.ball.position.x, board.ball.position.y)
+
+
+def quantize(speed_multiplier: float) -> float:
+    # The multiplier is stored as a half float. Feed the quantized value to the simulation so replays match exactly.
+    return struct.unpack("<e", struct.pack("<e", speed_multiplier))[0]
+
+
+class InputRecorder:
+    def __init__(self, path: str, seed: int, delta_time: float = 1.0 / FPS, number_blocks: tuple[int, int] = COLUMS_ROWS, swept: bool = False):
+        self.file: BinaryIO = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, delta_time, number_blocks[0], number_blocks[1], swept))
+        self.frames = 0
+
+    def record(self, direction: Direction, speed_multiplier: float, reset: bool = False) -> float:
+        # Records one step and returns the speed multiplier to step the board with
+        speed_multiplier = quantize(speed_multiplier)
+        self.file.write(FRAME.pack((direction.value + 1) | (RESET_FLAG if reset else 0), speed_multiplier))
+        self.frames += 1
+        return speed_multiplier
+
+    def record_reset(self):
+        # Board.reset() outside of a step, e.g. the restart key
+        self.file.write(FRAME.pack(RESET_FLAG | NO_STEP_FLAG | (Direction.STOP.value + 1), 1.0))
+
+    def close(self, board: Board):
+        if self.file.closed:
+            return
+        self.file.write(bytes((END_MARKER,)) + END.pack(*FinalState.of(board)))
+        self.file.close()
+
+
+class InputLog(NamedTuple):
+    seed: int
+    delta_time: float
+    number_blocks: tuple[int, int]
+    swept: bool
+    frames: bytes
+    final: FinalState | None # None if the recording was cut short
+
+
+def read_log(path: str) -> InputLog:
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, seed, delta_time, columns, rows, swept = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"'{path}' is not a version {VERSION} input log")
+
+    body = memoryview(data)[HEADER.size:]
+    final = None
+    length = len(body) - len(body) % FRAME.size
+    end = len(body) - 1 - END.size
+    if end >= 0 and end % FRAME.size == 0 and body[end] == END_MARKER:
+        final = FinalState(*END.unpack_from(body, end + 1))
+        length = end
+    return InputLog(seed, delta_time, (columns, rows), bool(swept), bytes(body[:length]), final)
+
+
+def replay(path: str, verify: bool = True) -> tuple[Board, dict[str, float]]:
+    # Re-runs a log as fast as possible. Raises ReplayMismatch if the final state differs from the recording.
+    log = read_log(path)
+    board = Board(BOARD_SIZE, log.number_blocks, swept=log.swept, seed=log.seed)
+
+    start = time.perf_counter()
+    steps = 0
+    for flags, speed_multiplier in FRAME.iter_unpack(log.frames):
+        if flags & RESET_FLAG:
+            board.reset()
+        if flags & NO_STEP_FLAG:
+            continue
+        advance(board, DIRECTIONS[(flags & 0b11) - 1], log.delta_time, speed_multiplier)
+        steps += 1
+    elapsed = time.perf_counter() - start
+
+    if verify and log.final is not None and FinalState.of(board) != log.final:
+        raise ReplayMismatch(f"Replay of '{path}' ended in {FinalState.of(board)}, the recording ended in {log.final}")
+    return board, {"steps": steps, "seconds": elapsed, "steps_per_second": steps / elapsed if elapsed > 0 else float("inf")}
@@ -0,0 +1,191 @@
+# Runs many independent Board episodes across worker processes.
+# Results are written into one shared memory block, so batches reach the learner without pickling.
+from components import Board, Direction
+from constants import *
+from observation import observation_size, write_observation
+from sim import advance
+
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+import os
+
+
+DIRECTIONS: dict[int, Direction] = {direction.value: direction for direction in Direction}
+
+
+def shared_layout(num_envs: int, number_blocks: tuple[int, int]) -> tuple[dict[str, tuple[np.dtype, tuple[int, ...], int]], int]:
+    # Name -> (dtype, shape, byte offset) of every array in the shared block, and the block's total size
+    fields = [
+        ("directions", np.int8, (num_envs,)),
+        ("speed_multipliers", np.float32, (num_envs,)),
+        ("observations", np.float32, (num_envs, observation_size(number_blocks))),
+        ("rewards", np.float32, (num_envs,)),
+        ("scores", np.int64, (num_envs,)),
+        ("lives", np.int32, (num_envs,)),
+        ("levels", np.int32, (num_envs,)),
+        ("codes", np.int8, (num_envs,)),
+        ("dones", np.bool_, (num_envs,)),
+    ]
+    layout = {}
+    offset = 0
+    for name, dtype, shape in fields:
+        dtype = np.dtype(dtype)
+        offset = (offset + 7) // 8 * 8 # 8-byte alignment
+        layout[name] = (dtype, shape, offset)
+        offset += dtype.itemsize * int(np.prod(shape))
+    return layout, offset
+
+
+def shared_views(buffer: memoryview, layout: dict[str, tuple[np.dtype, tuple[int, ...], int]]) -> dict[str, np.ndarray]:
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset) for name, (dtype, shape, offset) in layout.items()}
+
+
+def _worker(memory_name: str, layout: dict, envs: range, number_blocks: tuple[int, int], delta_time: float, seed: int | None, connection):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    views = shared_views(memory.buf, layout)
+    boards = {i: Board(BOARD_SIZE, number_blocks, seed=None if seed is None else seed + i) for i in envs}
+
+    def publish(i: int, board: Board):
+        write_observation(board, views["observations"][i])
+        views["scores"][i] = board.get_score()
+        views["lives"][i] = board.lives
+        views["levels"][i] = board.level
+
+    try:
+        while True:
+            command = connection.recv()
+            if command == "step":
+                directions = views["directions"]
+                speed_multipliers = views["speed_multipliers"]
+                for i, board in boards.items():
+                    lives = board.lives
+                    score = board.get_score()
+                    code = advance(board, DIRECTIONS[int(directions[i])], delta_time, float(speed_multipliers[i]))
+                    done = code == 0 and lives <= 1 # Game over, the board has already been reset for the next episode
+                    # The last reward is measured against the score the game ended with, not the new board's
+                    views["rewards"][i] = (board.final_score if done else board.get_score()) - score
+                    views["codes"][i] = code
+                    views["dones"][i] = done
+                    publish(i, board)
+            elif command == "reset":
+                for i, board in boards.items():
+                    board.reset()
+                    views["rewards"][i] = 0.0
+                    views["codes"][i] = 1
+                    views["dones"][i] = False
+                    publish(i, board)
+            else:
+                break
+            connection.send(True)
+    finally:
+        del views
+        memory.close()
+
+
+class RolloutRunner:
+    num_envs: int
+    num_workers: int
+
+    def __init__(self, num_envs: int, num_workers: int | None = None, number_blocks: tuple[int, int] = COLUMS_ROWS, delta_time: float = 1.0 / FPS, seed: int | None = None):
+        self.num_envs = num_envs
+        self.num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_envs))
+        self.pending = False
+
+        layout, size = shared_layout(num_envs, number_blocks)
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.views = shared_views(self.memory.buf, layout)
+        self.views["speed_multipliers"][:] = 1.0
+
+        self.connections = []
+        self.workers = []
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        for worker in range(self.num_workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker,
+                args=(self.memory.name, layout, range(bounds[worker], bounds[worker + 1]), number_blocks, delta_time, seed, child),
+                daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(process)
+
+        self.reset()
+
+    # Views into shared memory. They are overwritten by the next step, copy them to keep them.
+    @property
+    def observations(self) -> np.ndarray:
+        return self.views["observations"]
+
+    @property
+    def rewards(self) -> np.ndarray:
+        return self.views["rewards"]
+
+    @property
+    def dones(self) -> np.ndarray:
+        return self.views["dones"]
+
+    @property
+    def lives(self) -> np.ndarray:
+        return self.views["lives"]
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self.views["codes"]
+
+    def _send(self, command: str):
+        if self.pending:
+            raise RuntimeError("RolloutRunner: step_wait() must be called before issuing another command")
+        for connection in self.connections:
+            connection.send(command)
+        self.pending = True
+
+    def _wait(self):
+        for connection in self.connections:
+            connection.recv()
+        self.pending = False
+
+    def reset(self) -> np.ndarray:
+        self._send("reset")
+        self._wait()
+        return self.observations
+
+    def step_async(self, directions: np.ndarray, speed_multipliers: np.ndarray | float = 1.0):
+        # Starts a step on every worker and returns immediately. Collect the results with step_wait().
+        # `directions` holds Direction values (-1, 0, 1) per environment.
+        if self.pending:
+            raise RuntimeError("RolloutRunner: step_wait() must be called before issuing another command")
+        self.views["directions"][:] = directions
+        self.views["speed_multipliers"][:] = speed_multipliers
+        self._send("step")
+
+    def step_wait(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self._wait()
+        return self.observations, self.rewards, self.dones
+
+    def step_all(self, directions: np.ndarray, speed_multipliers: np.ndarray | float = 1.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.step_async(directions, speed_multipliers)
+        return self.step_wait()
+
+    def close(self):
+        if self.memory is None:
+            return
+        if self.pending:
+            self._wait()
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.workers:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.views = {}
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+    def __enter__(self) -> "RolloutRunner":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,72 @@
+# Headless simulation. Runs the game logic at full speed without a display, audio, pygame or numpy.
+from components import Board, Direction
+from constants import *
+
+import random
+import time
+from typing import Callable
+
+
+Policy = Callable[[Board], tuple[Direction, float]]
+
+
+def advance(board: Board, direction: Direction, delta_time: float, speed_multiplier: float = 1.0) -> int:
+    # One game step, including the rules the game loop applies on top of Board.update
+    game_state = board.update(direction, delta_time, speed_multiplier)
+    if game_state == -1:
+        board.speed_up(LEVEL_BALL_SPEED_MULTIPLIER)
+    return game_state
+
+
+def follow_ball(board: Board) -> tuple[Direction, float]:
+    # Simple autopilot: keep the paddle centre under the ball
+    paddle_centre = board.paddle.position.x + board.paddle.size[0] / 2
+    offset = board.ball.position.x - paddle_centre
+    if abs(offset) < board.paddle.size[0] / 4:
+        return Direction.STOP, 1.0
+    return (Direction.RIGHT if offset > 0 else Direction.LEFT), 1.0
+
+
+def intercept(board: Board) -> tuple[Direction, float]:
+    # Move the paddle centre to where the ball will reach the paddle line
+    prediction = board.predict()
+    target = board.ball.position.x if prediction is None else prediction.x
+    offset = target - (board.paddle.position.x + board.paddle.size[0] / 2)
+    if abs(offset) < board.paddle.size[0] / 4:
+        return Direction.STOP, 1.0
+    return (Direction.RIGHT if offset > 0 else Direction.LEFT), 1.0
+
+
+def random_policy(rng: random.Random) -> Policy:
+    # Moves the paddle at random. Takes its own generator, so a seeded run is reproducible.
+    def policy(board: Board) -> tuple[Direction, float]:
+        return rng.choice((Direction.LEFT, Direction.STOP, Direction.RIGHT)), 1.0
+    return policy
+
+
+def run(steps: int, policy: Policy = follow_ball, board: Board | None = None, delta_time: float = 1.0 / FPS, swept: bool = False, seed: int | None = None, recorder: object | None = None) -> dict[str, float]:
+    # `recorder` is a replay.InputRecorder (or anything with the same `record`) that every step's input goes to
+    if board is None:
+        board = Board(BOARD_SIZE, COLUMS_ROWS, swept=swept, seed=seed)
+
+    counts = {0: 0, 1: 0, 2: 0, 3: 0, -1: 0}
+    start = time.perf_counter()
+    for _ in range(steps):
+        direction, speed_multiplier = policy(board)
+        if recorder is not None:
+            speed_multiplier = recorder.record(direction, speed_multiplier)
+        counts[advance(board, direction, delta_time, speed_multiplier)] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_second": steps / elapsed if elapsed > 0 else float("inf"),
+        "level": board.level,
+        "score": board.get_score(),
+        "lives": board.lives,
+        "lives_lost": counts[0],
+        "blocks_hit": counts[2],
+        "paddle_hits": counts[3],
+        "levels_cleared": counts[-1],
+    }
@@ -0,0 +1,157 @@
+# Sound effect playback on a fixed set of reserved mixer channels. Short effects go to a voice pool that cuts off
+# the oldest, least important voice when every voice is busy, so rapid block hits can never starve the mixer.
+# Multi-note cues play one note after another on a channel of their own, fed through `Channel.queue`.
+# Generated sounds are cached as raw PCM on disk, so they are only synthesised on the first launch.
+from constants import *
+from sound.waves import sine
+
+from collections import deque
+from typing import Callable
+import hashlib
+import os
+import time
+
+import pygame
+
+
+class SoundBank:
+    # Generated sounds by frequency, duration and waveform, kept in memory and in `cache_path` (if not None)
+    def __init__(self, cache_path: str | None = AUDIO_CACHE_PATH):
+        self.cache_path = os.path.expanduser(cache_path) if cache_path is not None else None
+        self.sounds: dict[tuple[float, float, Callable], pygame.mixer.Sound] = {}
+        self.generated = 0 # Sounds synthesised because they were not cached yet
+
+    def file_path(self, frequency: float, duration: float, wave: Callable) -> str:
+        # Names the file after everything that decides its samples: the generator (and a hash of its code, so
+        # editing it invalidates the file), the synthesis version and the sample format, since the files are
+        # raw samples without a header. Only module-level generators have a name that means the same next launch.
+        from sound.sound import SYNTHESIS_VERSION
+
+        name = getattr(wave, "__qualname__", None)
+        code = getattr(wave, "__code__", None)
+        if name is None or code is None or "<" in name:
+            raise ValueError(f"SoundBank can only cache module-level wave functions, not {wave!r}")
+        digest = hashlib.sha1(code.co_code + repr(code.co_consts).encode()).hexdigest()[:12]
+        file_name = f"{wave.__module__}.{name}-{digest}-v{SYNTHESIS_VERSION}-{frequency!r}-{duration!r}-{AUDIO_SAMPLE_RATE}-{AUDIO_BIT_DEPTH}-{AUDIO_CHANNELS}.pcm"
+        return os.path.join(self.cache_path, file_name)
+
+    def get(self, frequency: float, duration: float, wave: Callable = sine) -> pygame.mixer.Sound:
+        key = (frequency, duration, wave)
+        sound = self.sounds.get(key)
+        if sound is not None:
+            return sound
+
+        path = self.file_path(*key) if self.cache_path is not None else None
+        data = None
+        if path is not None:
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+            except OSError:
+                pass
+        if data is None:
+            from sound.sound import Sound # Only needed on a cache miss
+
+            data = Sound(frequency, duration, wave).samples().tobytes()
+            self.generated += 1
+            if path is not None:
+                try:
+                    os.makedirs(self.cache_path, exist_ok=True)
+                    # Written under a temporary name first, so a crash never leaves a truncated file behind
+                    temporary = f"{path}.{os.getpid()}.tmp"
+                    with open(temporary, "wb") as file:
+                        file.write(data)
+                    os.replace(temporary, path)
+                except OSError: # A read-only cache only costs the synthesis on the next launch
+                    pass
+
+        sound = self.sounds[key] = pygame.mixer.Sound(buffer=data)
+        return sound
+
+
+def reserve_channels(count: int) -> list[pygame.mixer.Channel]:
+    # Reserves the first `count` mixer channels, which `Sound.play` will then never pick on its own
+    if pygame.mixer.get_num_channels() < count:
+        pygame.mixer.set_num_channels(count)
+    pygame.mixer.set_reserved(count)
+    return [pygame.mixer.Channel(i) for i in range(count)]
+
+
+class VoicePool:
+    def __init__(self, channels: list[pygame.mixer.Channel]):
+        self.channels = channels
+        self.priorities = [0] * len(channels)
+        self.started = [0] * len(channels) # time.perf_counter_ns() each voice last started at
+        self.stolen = 0
+        self.dropped = 0
+
+    def play(self, sound: pygame.mixer.Sound, priority: int = 0) -> pygame.mixer.Channel | None:
+        # Plays on a free voice, or cuts off the oldest voice of the lowest priority not above `priority`.
+        # Returns None if every voice is playing something more important.
+        voice = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                voice = index
+                break
+        if voice is None:
+            for index in range(len(self.channels)):
+                if self.priorities[index] > priority:
+                    continue
+                if voice is None or (self.priorities[index], self.started[index]) < (self.priorities[voice], self.started[voice]):
+                    voice = index
+            if voice is None:
+                self.dropped += 1
+                return None
+            self.stolen += 1
+
+        channel = self.channels[voice]
+        channel.play(sound)
+        self.priorities[voice] = priority
+        self.started[voice] = time.perf_counter_ns()
+        return channel
+
+
+class NullVoicePool:
+    # Stands in for `VoicePool` while the mixer is not ready, or when there is no audio device
+    def play(self, sound: pygame.mixer.Sound | None, priority: int = 0) -> None:
+        return None
+
+
+class Sequencer:
+    # Plays cues (lists of sounds) one note after another on its own channel. The mixer only holds one queued
+    # sound per channel, so `update` has to be called regularly (once a frame is plenty) to queue the next note.
+    def __init__(self, channel: pygame.mixer.Channel):
+        self.channel = channel
+        self.pending: deque[pygame.mixer.Sound] = deque()
+
+    def play(self, cue: list[pygame.mixer.Sound]):
+        # Replaces whatever cue is playing
+        self.pending = deque(cue)
+        if self.pending:
+            self.channel.play(self.pending.popleft())
+        self.update()
+
+    def update(self):
+        if self.pending and self.channel.get_queue() is None:
+            self.channel.queue(self.pending.popleft())
+
+    def stop(self):
+        self.pending.clear()
+        self.channel.stop()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.pending) or self.channel.get_busy()
+
+
+class NullSequencer:
+    busy = False
+
+    def play(self, cue: list[pygame.mixer.Sound]):
+        pass
+
+    def update(self):
+        pass
+
+    def stop(self):
+        pass
@@ -5,23 +5,30 @@ import numpy as np
 import pygame
 
 
+SYNTHESIS_VERSION: int = 1 # Bump whenever `Sound.samples` changes what it produces, so cached sounds are regenerated
+
 class Sound:
     def __init__(self, frequency: float, duration_seconds: float, sound_wave_generator: callable = sine):
         self.frequency = frequency
         self.duration = duration_seconds
         self.sound_wave_generator = sound_wave_generator
 
-    def generate(self) -> pygame.mixer.Sound:
+    def samples(self) -> np.ndarray:
+        # int16 samples, one column per audio channel
         num_samples = int(AUDIO_SAMPLE_RATE * self.duration)
         amplitude = 2 ** (AUDIO_BIT_DEPTH - 1) - 1
 
-        samples = np.array([self.sound_wave_generator(amplitude, self.frequency, i / AUDIO_SAMPLE_RATE) for i in range(num_samples)], dtype=np.int16)
+        time = np.arange(num_samples) / AUDIO_SAMPLE_RATE
+        try:
+            samples = np.asarray(self.sound_wave_generator(amplitude, self.frequency, time))
+        except TypeError: # Generator only handles scalar times
+            samples = None
+        if samples is None or samples.shape != time.shape:
+            samples = np.array([self.sound_wave_generator(amplitude, self.frequency, t) for t in time.tolist()])
+        samples = np.clip(samples, -amplitude - 1, amplitude).astype(np.int16)
         if AUDIO_CHANNELS > 1:
             samples = np.repeat(samples[:, np.newaxis], AUDIO_CHANNELS, axis=1)
+        return samples
 
-        return pygame.sndarray.make_sound(samples)
-    
-
-def play_sounds(sounds: list[pygame.mixer.Sound]):
-    for sound in sounds:
-        sound.play()
\ No newline at end of file
+    def generate(self) -> pygame.mixer.Sound:
+        return pygame.sndarray.make_sound(self.samples())
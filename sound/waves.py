@@ -1,17 +1,20 @@
-import math
 import numpy as np
 
-def noise(amplitude: float, frequency: float, time: float, phase: float = 0.0) -> float:
-    return amplitude * np.random.uniform(-1, 1)
+# Every generator takes a scalar time or a NumPy array of times.
+# Arrays produce the whole buffer in one vectorized call, scalars still return a single sample.
+# (`[()]` turns 0-d results back into scalars and leaves arrays untouched.)
 
-def sine(amplitude: float, frequency: float, time: float, phase: float = 0.0) -> float:
-    return amplitude * math.sin(2 * math.pi * frequency * time + phase)
+def noise(amplitude: float, frequency: float, time: float | np.ndarray, phase: float = 0.0) -> float | np.ndarray:
+    return amplitude * np.random.uniform(-1, 1, np.shape(time))[()]
 
-def sawtooth(amplitude: float, frequency: float, time: float, phase: float = 0.0) -> float:
-    return amplitude * (2 * (time * frequency - math.floor(time * frequency + 0.5 + phase / (2 * math.pi))) - 0.5)
+def sine(amplitude: float, frequency: float, time: float | np.ndarray, phase: float = 0.0) -> float | np.ndarray:
+    return amplitude * np.sin(2 * np.pi * frequency * time + phase)
 
-def square(amplitude: float, frequency: float, time: float, phase: float = 0.0) -> float:
-    return amplitude * (1 if math.sin(2 * math.pi * frequency * time + phase) >= 0 else -1)
+def sawtooth(amplitude: float, frequency: float, time: float | np.ndarray, phase: float = 0.0) -> float | np.ndarray:
+    return amplitude * (2 * (time * frequency - np.floor(time * frequency + 0.5 + phase / (2 * np.pi))) - 0.5)
 
-def triangle(amplitude: float, frequency: float, time: float, phase: float = 0.0) -> float:
-    return amplitude * (2 * abs(2 * (time * frequency - math.floor(time * frequency + 0.5 + phase / (2 * math.pi))) - 0.5) - 1)
\ No newline at end of file
+def square(amplitude: float, frequency: float, time: float | np.ndarray, phase: float = 0.0) -> float | np.ndarray:
+    return amplitude * np.where(np.sin(2 * np.pi * frequency * time + phase) >= 0, 1, -1)[()]
+
+def triangle(amplitude: float, frequency: float, time: float | np.ndarray, phase: float = 0.0) -> float | np.ndarray:
+    return amplitude * (2 * np.abs(2 * (time * frequency - np.floor(time * frequency + 0.5 + phase / (2 * np.pi))) - 0.5) - 1)
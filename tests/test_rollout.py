@@ -0,0 +1,34 @@
+from components import Board, Direction
+from constants import *
+from rollout import RolloutRunner
+from sim import advance, follow_ball
+
+import numpy as np
+
+
+def test_episode_return_is_score_difference():
+    # Steps the runner and a local copy of every board with the same actions. Each board follows the ball until it
+    # has some points and then lets it drop, so episodes end quickly and with a score. Each finished episode's
+    # summed reward has to equal the score it ended with minus the score it started with.
+    num_envs, seed, delta_time = 4, 123, 3.0 / FPS
+    boards = [Board(BOARD_SIZE, COLUMS_ROWS, seed=seed + i) for i in range(num_envs)]
+    for board in boards: # The runner starts with a reset
+        board.reset()
+    starts = [board.get_score() for board in boards]
+    returns = [0.0] * num_envs
+    finished = []
+    with RolloutRunner(num_envs, 2, delta_time=delta_time, seed=seed) as runner:
+        for _ in range(12_000):
+            directions = [follow_ball(board)[0] if board.lives == LIVES and board.score < 30 else Direction.LEFT for board in boards]
+            _, rewards, dones = runner.step_all(np.array([direction.value for direction in directions]))
+            for i, board in enumerate(boards):
+                lives = board.lives
+                code = advance(board, directions[i], delta_time)
+                returns[i] += float(rewards[i])
+                assert bool(dones[i]) == (code == 0 and lives <= 1)
+                if dones[i]:
+                    assert returns[i] == board.final_score - starts[i]
+                    finished.append(returns[i])
+                    starts[i] = board.get_score()
+                    returns[i] = 0.0
+    assert finished and all(finished)
@@ -0,0 +1,230 @@
+from components import Board, Direction
+from constants import *
+
+import math
+import numpy as np
+
+
+class VecBoard:
+    # Keeps the state of many boards in NumPy arrays and steps them all at once.
+    # Every board shares the geometry of a single `Board` built from `bounds` and `number_blocks`,
+    # and `step` reproduces `Board.update` (including its return codes) for each of them.
+    num_boards: int
+
+    bounds: tuple[float, float]
+    original_bounds: tuple[float, float]
+    number_blocks: tuple[int, int]
+    block_size: float
+    block_area: float
+    top_space: int
+
+    ball_radius: float
+    paddle_size: tuple[float, float]
+
+    def __init__(self, num_boards: int, bounds: tuple[float, float] = BOARD_SIZE, number_blocks: tuple[int, int] = COLUMS_ROWS, seed: int | None = None):
+        template = Board(bounds, number_blocks)
+
+        self.num_boards = num_boards
+        self.bounds = template.bounds
+        self.original_bounds = template.original_bounds
+        self.number_blocks = number_blocks
+        self.block_size = bounds[0] / number_blocks[0]
+        self.block_area = template.block_area
+        self.top_space = template.top_space
+
+        self.ball_radius = template.ball.radius
+        self.ball_start = (template.ball.position[0], template.ball.position[1])
+        self.ball_respawn = (self.original_bounds[0] / 2, self.original_bounds[1] * (1 - 0.1))
+
+        self.paddle_size = template.paddle.size
+        self.paddle_start = (template.paddle.position[0], template.paddle.position[1])
+        self.paddle_max_speed = template.paddle.max_speed
+        self.paddle_base_speed = template.paddle.base_speed
+        self.paddle_acceleration = template.paddle.acceleration_factor
+        self.paddle_deceleration = template.paddle.deceleration_factor
+
+        # Block geometry, one entry per block in the same order as `Board.blocks`
+        columns, rows = number_blocks
+        self.block_x = np.tile(np.arange(columns, dtype=np.float64) * self.block_size, rows)
+        self.block_y = np.repeat(np.arange(self.top_space, rows + self.top_space, dtype=np.float64) * self.block_size, columns)
+        # Candidate cells per axis around the ball. Covers a ball touching a cell boundary exactly.
+        self._span = int(math.floor(2 * self.ball_radius / self.block_size)) + 3
+
+        self.rng = np.random.default_rng(seed)
+
+        self.ball_position = np.empty((num_boards, 2), dtype=np.float64)
+        self.ball_velocity = np.empty((num_boards, 2), dtype=np.float64)
+        self.ball_max_velocity = np.empty(num_boards, dtype=np.float64)
+        self.paddle_position = np.empty((num_boards, 2), dtype=np.float64)
+        self.paddle_velocity = np.empty(num_boards, dtype=np.float64)
+        self.blocks = np.empty((num_boards, columns * rows), dtype=bool)
+        self.blocks_left = np.empty(num_boards, dtype=np.int64)
+        self.level = np.empty(num_boards, dtype=np.int64)
+        self.score = np.empty(num_boards, dtype=np.int64)
+        self.lives = np.empty(num_boards, dtype=np.int64)
+
+        self.reset()
+
+    def _random_velocity_x(self, count: int) -> np.ndarray:
+        return self.rng.choice(np.array([-5.0, 5.0]), size=count)
+
+    def _reset_boards(self, mask: np.ndarray, level: np.ndarray | int, score: np.ndarray | int, lives: np.ndarray | int):
+        # Equivalent of `Board.__init__` for the selected boards
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return
+        self.ball_position[mask] = self.ball_start
+        self.ball_velocity[mask, 0] = self._random_velocity_x(count)
+        self.ball_velocity[mask, 1] = -BASE_BALL_VELOCITY
+        self.ball_max_velocity[mask] = BASE_BALL_MAX_VELOCITY
+        self.paddle_position[mask] = self.paddle_start
+        self.paddle_velocity[mask] = 0.0
+        self.blocks[mask] = True
+        self.blocks_left[mask] = self.blocks.shape[1]
+        self.level[mask] = level
+        self.score[mask] = score
+        self.lives[mask] = lives
+
+    def reset(self, indices: np.ndarray | None = None):
+        mask = np.ones(self.num_boards, dtype=bool)
+        if indices is not None:
+            mask[:] = False
+            mask[indices] = True
+        self._reset_boards(mask, 1, 0, LIVES)
+
+    def get_score(self) -> np.ndarray:
+        return self.score * 15 + self.level ** 3
+
+    def _update_paddles(self, directions: np.ndarray, delta_time: float, speed_multipliers: np.ndarray | float):
+        velocity = self.paddle_velocity
+        position = self.paddle_position[:, 0]
+        speed = np.abs(velocity)
+        sign = np.where(velocity > 0, 1.0, -1.0)
+        limit = self.original_bounds[0] - self.paddle_size[0]
+
+        # === Deceleration ===
+        stopping = (directions == Direction.STOP.value) & (speed > 0)
+        decelerated = np.maximum(speed - speed * self.paddle_deceleration * delta_time, 0.0)
+
+        # === Acceleration ===
+        moving = directions != Direction.STOP.value
+        accelerated = np.maximum(speed, self.paddle_base_speed)
+        accelerated = np.minimum(accelerated + accelerated * self.paddle_acceleration * delta_time, self.paddle_max_speed * speed_multipliers)
+
+        new_velocity = np.where(moving, accelerated * directions, np.where(stopping, decelerated * sign, velocity))
+        changed = stopping | moving
+        velocity[:] = new_velocity
+        position[changed] = np.minimum(np.maximum(position[changed] + velocity[changed] * delta_time, 0.0), limit)
+
+    def _bounce(self, axis: int, mask: np.ndarray):
+        velocity = self.ball_velocity[mask, axis]
+        self.ball_velocity[mask, axis] = -np.minimum(self.ball_max_velocity[mask], np.abs(velocity)) * np.where(velocity > 0, 1.0, -1.0)
+
+    def _find_block_hits(self, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Returns the boards that hit a block and the index of the first block hit on each,
+        # scanning the few cells around the ball in the same order as `Board.blocks`.
+        boards = np.flatnonzero(candidates)
+        if not boards.size:
+            return boards, boards
+        columns, rows = self.number_blocks
+        radius = self.ball_radius
+        x = self.ball_position[boards, 0]
+        y = self.ball_position[boards, 1]
+
+        offsets = np.arange(self._span)
+        cell_x = np.floor((x - radius) / self.block_size).astype(np.int64) - 1
+        cell_y = np.floor((y - radius) / self.block_size).astype(np.int64) - 1 - self.top_space
+        cols = cell_x[:, None, None] + offsets[None, None, :]
+        rows_ = cell_y[:, None, None] + offsets[None, :, None]
+        valid = (cols >= 0) & (cols < columns) & (rows_ >= 0) & (rows_ < rows)
+        index = np.where(valid, rows_ * columns + cols, 0).reshape(len(boards), -1)
+        valid = valid.reshape(len(boards), -1)
+
+        block_x = self.block_x[index]
+        block_y = self.block_y[index]
+        hit = valid & self.blocks[boards[:, None], index] & \
+              (x[:, None] + radius >= block_x) & \
+              (x[:, None] - radius <= block_x + self.block_size) & \
+              (y[:, None] + radius >= block_y) & \
+              (y[:, None] - radius <= block_y + self.block_size)
+
+        any_hit = hit.any(axis=1)
+        first = index[np.arange(len(boards)), hit.argmax(axis=1)]
+        return boards[any_hit], first[any_hit]
+
+    def step(self, directions: np.ndarray, delta_time: float, speed_multipliers: np.ndarray | float = 1.0) -> np.ndarray:
+        # `directions` holds `Direction` values (-1, 0, 1) per board. Returns the `Board.update` code per board.
+        directions = np.asarray(directions)
+        radius = self.ball_radius
+        position = self.ball_position
+        velocity = self.ball_velocity
+
+        position += velocity * delta_time
+        self._update_paddles(directions, delta_time, speed_multipliers)
+
+        codes = np.ones(self.num_boards, dtype=np.int8)
+
+        # Bottom Wall
+        dropped = position[:, 1] - radius >= self.bounds[1]
+        if dropped.any():
+            self.lives[dropped] -= 1
+            game_over = dropped & (self.lives <= 0)
+            self._reset_boards(game_over, 1, 0, LIVES)
+            respawn = dropped & ~game_over
+            count = int(np.count_nonzero(respawn))
+            if count:
+                position[respawn] = self.ball_respawn
+                velocity[respawn, 0] = self._random_velocity_x(count)
+                velocity[respawn, 1] = -BASE_BALL_VELOCITY
+                self.paddle_position[respawn] = self.paddle_start
+                self.paddle_velocity[respawn] = 0.0
+            self.score[dropped] = np.maximum(self.score[dropped] - 5 * (self.level[dropped] ** 1.5), 0).astype(np.int64)
+            codes[dropped] = 0
+        active = ~dropped
+
+        # Left/Right Walls
+        side = active & ((position[:, 0] - radius <= 0) | (position[:, 0] + radius >= self.bounds[0]))
+        if side.any():
+            self._bounce(0, side)
+            position[side, 0] = np.where(velocity[side, 0] > 0, radius, self.bounds[0] - radius)
+
+        # Top Wall
+        top = active & (position[:, 1] - radius <= 0)
+        if top.any():
+            self._bounce(1, top)
+            position[top, 1] = radius
+
+        # Paddle Collision
+        paddle_x = self.paddle_position[:, 0]
+        paddle = active & (position[:, 1] + radius >= self.paddle_position[:, 1]) & \
+                 (position[:, 0] >= paddle_x) & (position[:, 0] <= paddle_x + self.paddle_size[0])
+        if paddle.any():
+            relative_intersect = (position[paddle, 0] - paddle_x[paddle]) / self.paddle_size[0]
+            # Python's float pow rounds differently from NumPy's square/sqrt shortcuts.
+            # Paddle hits are rare, so compute the speed per ball to match `Board.update` bit for bit.
+            speed = np.array([(vx ** 2 + vy ** 2) ** 0.5 for vx, vy in velocity[paddle].tolist()])
+            bounce_angle = (relative_intersect - 0.5) * 2.0
+            velocity[paddle, 0] = speed * bounce_angle * 1.5
+            velocity[paddle, 1] = -(speed * (1 - np.abs(bounce_angle) * 0.5))
+            codes[paddle] = 3
+            active &= ~paddle
+
+        # Block Collisions
+        candidates = active & (position[:, 1] - radius <= self.block_area)
+        boards, hit_blocks = self._find_block_hits(candidates)
+        if boards.size:
+            self.blocks[boards, hit_blocks] = False
+            self.blocks_left[boards] -= 1
+            hit = np.zeros(self.num_boards, dtype=bool)
+            hit[boards] = True
+            self._bounce(1, hit)
+            self.score[boards] += 1
+            codes[boards] = 2
+            candidates &= ~hit
+
+        cleared = candidates & (self.blocks_left == 0)
+        if cleared.any():
+            self._reset_boards(cleared, self.level[cleared] + 1, self.score[cleared] + 10, self.lives[cleared])
+            codes[cleared] = -1
+
+        return codes
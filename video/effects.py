@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 
@@ -13,9 +14,65 @@ class Effect:
         return not self.duration or self.elapsed_time < self.duration
 
     def apply(self, surface: pygame.Surface):
+        apply_effects(surface, [self])
+
+    def apply_pixels(self, pixels: np.ndarray, format: "PixelFormat"):
+        # Works in place on a (width, height) uint32 view of the surface's pixels
         pass
 
 
+class PixelFormat:
+    # Channel masks and shifts of a 32-bit surface, for working on packed pixels
+    def __init__(self, surface: pygame.Surface):
+        self.masks = tuple(np.uint32(mask) for mask in surface.get_masks())
+        self.shifts = tuple(np.uint32(shift) for shift in surface.get_shifts())
+
+
+def apply_effects(surface: pygame.Surface, effects: list[Effect]):
+    # Runs every effect on one shared pixel view, so the surface is only locked once per frame
+    if not effects:
+        return
+    if surface.get_bytesize() != 4:
+        # Packed pixel views need 32-bit pixels
+        converted = surface.convert(32)
+        apply_effects(converted, effects)
+        surface.blit(converted, (0, 0))
+        return
+
+    format = PixelFormat(surface)
+    pixels = pygame.surfarray.pixels2d(surface)
+    try:
+        for effect in effects:
+            effect.apply_pixels(pixels, format)
+    finally:
+        del pixels # Unlocks the surface
+
+
+def shift_columns(pixels: np.ndarray, shift: int, buffer: np.ndarray, mask: np.uint32 | None = None):
+    # Moves pixels `shift` columns to the right (left if negative), filling the gap with black.
+    # With a mask, the result is written to `buffer` (limited to the masked channels) instead of back into `pixels`.
+    # `buffer` must have the same shape as `pixels` and is reused between frames to avoid allocations.
+    width = pixels.shape[0]
+    shift = max(min(shift, width), -width)
+    if shift >= 0:
+        source, target, gap = pixels[:width - shift], buffer[shift:], buffer[:shift]
+    else:
+        source, target, gap = pixels[-shift:], buffer[:width + shift], buffer[width + shift:]
+
+    if mask is None:
+        np.copyto(buffer[:target.shape[0]], source)
+        if shift >= 0:
+            pixels[shift:] = buffer[:target.shape[0]]
+            pixels[:shift] = 0
+        else:
+            pixels[:width + shift] = buffer[:target.shape[0]]
+            pixels[width + shift:] = 0
+        return
+
+    np.bitwise_and(source, mask, out=target)
+    gap[...] = 0
+
+
 class ScanlineEffect(Effect):
     def __init__(self, duration: int = 0, speed: int = 24, offset: int = 3, colour: tuple = (255, 255, 255), alpha: int = 255, thickness: int = 2):
         super().__init__(duration)
@@ -24,58 +81,67 @@ class ScanlineEffect(Effect):
         self.colour = colour
         self.alpha = alpha
         self.thickness = thickness
-        self._surface = None
+        self._buffer = None
+        self._channel = None
+        self._line = None
 
-    def apply(self, surface: pygame.Surface):
-        width, height = surface.get_size()
+    def apply_pixels(self, pixels: np.ndarray, format: PixelFormat):
+        width, height = pixels.shape
         scanline_y = (self.elapsed_time * self.speed / 1000) % height
 
         # Move the part of the frame above the scanline offset pixels to the right
         if scanline_y > 0 and scanline_y < height - self.thickness / 2:
             section_height = int(scanline_y + self.thickness / 2)
-            rect_to_move = pygame.Rect(0, 0, width - self.offset, section_height)
+            if self._buffer is None or self._buffer.shape != pixels.shape:
+                self._buffer = np.empty(pixels.shape, dtype=np.uint32, order="F")
+            shift_columns(pixels[:, :section_height], self.offset, self._buffer[:, :section_height])
+
+        # Draw the scanline, blended per channel the same way as an alpha blit
+        top = int(scanline_y)
+        bottom = min(top + self.thickness, height)
+        if bottom <= top:
+            return
+        if self._channel is None or self._channel.shape != (width, self.thickness):
+            self._channel = np.empty((width, self.thickness), dtype=np.int32)
+            self._line = np.empty((width, self.thickness), dtype=np.uint32)
+        line = pixels[:, top:bottom]
+        channel = self._channel[:, :bottom - top]
+        result = self._line[:, :bottom - top]
+        result[...] = 0
+        for colour, mask, shift in zip(self.colour, format.masks, format.shifts):
+            np.bitwise_and(line, mask, out=channel, casting="unsafe")
+            channel >>= shift
+            # dst + (((src - dst) * alpha + src) >> 8)
+            destination = channel.copy()
+            np.subtract(colour, channel, out=channel)
+            channel *= self.alpha
+            channel += colour
+            channel >>= 8
+            channel += destination
+            result |= channel.astype(np.uint32) << shift
+        alpha_mask = format.masks[3]
+        if alpha_mask:
+            result |= line & alpha_mask
+        line[...] = result
 
-            surface.blit(surface, (self.offset, 0), rect_to_move)
-            surface.fill((0, 0, 0), (0, 0, self.offset, section_height))
-
-        # Draw the scanline
-        if self._surface is None or self._surface.get_width() != width:
-            self._surface = pygame.Surface((width, self.thickness), pygame.SRCALPHA)
-            self._surface.fill((*self.colour, self.alpha))
-            
-        surface.blit(self._surface, (0, scanline_y))
 
 class ColourShiftEffect(Effect):
     def __init__(self, duration: int = 0, red_shift: int = 2, blue_shift: int = -2):
         super().__init__(duration)
         self.red_shift = red_shift
         self.blue_shift = blue_shift
-        self._surface = None
-        self._red_surface = None
-        self._green_surface = None
-        self._blue_surface = None
-
-    def apply(self, surface: pygame.Surface):
-        width, height = surface.get_size()
-
-        if self._surface is None or self._surface.get_size() != (width, height):
-            self._surface = surface.copy()
-            self._red_surface = surface.copy()
-            self._green_surface = surface.copy()
-            self._blue_surface = surface.copy()
-
-        # Clear the target surface to black so we can add channels back in
-        self._surface.blit(surface, (0, 0))
-        surface.fill((0, 0, 0))
-        
-        self._red_surface.blit(self._surface, (0, 0))
-        self._red_surface.fill((255, 0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        surface.blit(self._red_surface, (self.red_shift, 0), special_flags=pygame.BLEND_ADD)
-
-        self._green_surface.blit(self._surface, (0, 0))
-        self._green_surface.fill((0, 255, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        surface.blit(self._green_surface, (0, 0), special_flags=pygame.BLEND_ADD)
-
-        self._blue_surface.blit(self._surface, (0, 0))
-        self._blue_surface.fill((0, 0, 255), special_flags=pygame.BLEND_RGBA_MULT)
-        surface.blit(self._blue_surface, (self.blue_shift, 0), special_flags=pygame.BLEND_ADD)
\ No newline at end of file
+        self._red = None
+        self._blue = None
+
+    def apply_pixels(self, pixels: np.ndarray, format: PixelFormat):
+        # Shift the red and blue channels sideways, green (and alpha) stays where it is
+        if self._red is None or self._red.shape != pixels.shape:
+            self._red = np.empty(pixels.shape, dtype=np.uint32, order="F")
+            self._blue = np.empty(pixels.shape, dtype=np.uint32, order="F")
+
+        red_mask, _, blue_mask, _ = format.masks
+        shift_columns(pixels, self.red_shift, self._red, red_mask)
+        shift_columns(pixels, self.blue_shift, self._blue, blue_mask)
+        pixels &= ~(red_mask | blue_mask)
+        pixels |= self._red
+        pixels |= self._blue
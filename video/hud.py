@@ -0,0 +1,52 @@
+from colours import *
+
+import pygame
+
+
+class Hud:
+    # Level/Score/Lives text. Labels and digit glyphs are rendered once,
+    # and the values are composed from cached glyphs only when they change.
+    def __init__(self, font: pygame.font.Font, position: tuple[float, float], colour: tuple[int, int, int] = WHITE, background: tuple[int, int, int] = BLACK, spacing: int = 10):
+        self.font = font
+        self.position = position # Bottom left
+        self.colour = colour
+        self.background = background
+        self.spacing = spacing
+
+        self.labels = [self.font.render(label, True, colour) for label in ("Level: ", "Score: ", "Lives: ")]
+        self.glyphs: dict[str, pygame.Surface] = {}
+        for character in "0123456789":
+            self.glyph(character)
+
+        self.values: tuple[int, int, int] | None = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def glyph(self, character: str) -> pygame.Surface:
+        surface = self.glyphs.get(character)
+        if surface is None:
+            surface = self.glyphs[character] = self.font.render(character, True, self.colour)
+        return surface
+
+    def draw(self, surface: pygame.Surface, level: int, score: int, lives: int, force: bool = False) -> list[pygame.Rect]:
+        # Returns the rectangles that changed, which is nothing when the values did not change
+        values = (level, score, lives)
+        if values == self.values and not force:
+            return []
+        self.values = values
+
+        previous_rect = self.rect
+        surface.fill(self.background, previous_rect)
+
+        x, bottom = self.position
+        rects = []
+        for label, value in zip(self.labels, values):
+            rects.append(surface.blit(label, (x, bottom - label.get_height())))
+            x += label.get_width()
+            for character in str(value):
+                glyph = self.glyph(character)
+                rects.append(surface.blit(glyph, (x, bottom - glyph.get_height())))
+                x += glyph.get_width()
+            x += self.spacing
+
+        self.rect = rects[0].unionall(rects[1:])
+        return [previous_rect, self.rect]
@@ -0,0 +1,49 @@
+from colours import *
+from profiler import FrameProfiler
+
+import pygame
+
+
+class ProfilerOverlay:
+    # Table of p50/p95/p99 times per frame phase and any other recorded series.
+    # The table is only re-rendered every `interval` frames.
+    def __init__(self, font: pygame.font.Font, position: tuple[float, float], colour: tuple[int, int, int] = WHITE, background: tuple[int, int, int] = BLACK, interval: int = 30):
+        self.font = font
+        self.position = position # Top left
+        self.colour = colour
+        self.background = background
+        self.interval = interval
+
+        self.name_width = max(self.font.size(name)[0] for name in ("present", "latency")) + 8
+        self.column_width = self.font.size("00.00")[0] + 8
+        self.line_height = self.font.get_linesize()
+
+        self.countdown = 0
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def render(self, profiler: FrameProfiler) -> pygame.Surface:
+        rows = [("ms", "p50", "p95", "p99")]
+        for phase in profiler.buffers:
+            rows.append((phase, *(f"{value:.2f}" for value in profiler.percentiles(phase))))
+
+        surface = pygame.Surface((self.name_width + 3 * self.column_width, self.line_height * len(rows)))
+        surface.fill(self.background)
+        for y, row in enumerate(rows):
+            top = y * self.line_height
+            surface.blit(self.font.render(row[0], True, self.colour), (0, top))
+            for x, text in enumerate(row[1:]):
+                text_surface = self.font.render(text, True, self.colour)
+                surface.blit(text_surface, (self.name_width + (x + 1) * self.column_width - text_surface.get_width(), top))
+        return surface
+
+    def draw(self, surface: pygame.Surface, profiler: FrameProfiler, force: bool = False) -> list[pygame.Rect]:
+        # Returns the rectangles that changed
+        self.countdown -= 1
+        if self.countdown > 0 and not force:
+            return []
+        self.countdown = self.interval
+
+        previous_rect = self.rect
+        surface.fill(self.background, previous_rect)
+        self.rect = surface.blit(self.render(profiler), self.position)
+        return [previous_rect, self.rect]
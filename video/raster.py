@@ -0,0 +1,132 @@
+# Draws a Board straight into NumPy arrays for agent observations. Needs no display and no pygame.
+from colours import *
+from components import Board
+from constants import *
+
+import numpy as np
+
+
+def luminance(colour: tuple[int, int, int]) -> int:
+    return int(round(0.299 * colour[0] + 0.587 * colour[1] + 0.114 * colour[2]))
+
+
+class FrameStack:
+    # Ring buffer of the last `depth` frames. Frames are written in place, stacking only copies on request.
+    def __init__(self, frame_shape: tuple[int, ...], depth: int):
+        self.frames = np.zeros((depth, *frame_shape), dtype=np.uint8)
+        self.depth = depth
+        self.head = 0 # Slot the next frame goes into
+
+    def next_slot(self) -> np.ndarray:
+        return self.frames[self.head]
+
+    def advance(self):
+        self.head = (self.head + 1) % self.depth
+
+    def fill(self, frame: np.ndarray):
+        self.frames[:] = frame
+
+    def stacked(self, out: np.ndarray | None = None) -> np.ndarray:
+        # Oldest to newest along the first axis
+        if out is None:
+            out = np.empty_like(self.frames)
+        older = self.depth - self.head
+        out[:older] = self.frames[self.head:]
+        out[older:] = self.frames[:self.head]
+        return out
+
+
+class Rasteriser:
+    resolution: tuple[int, int] # Width, height
+    grayscale: bool
+
+    def __init__(self, resolution: tuple[int, int] = (84, 84), grayscale: bool = True, stack: int = 1, board_size: tuple[float, float] = BOARD_SIZE):
+        self.resolution = resolution
+        self.grayscale = grayscale
+        self.scale = (resolution[0] / board_size[0], resolution[1] / board_size[1])
+
+        frame_shape = (resolution[1], resolution[0]) if grayscale else (resolution[1], resolution[0], 3)
+        self.stack = FrameStack(frame_shape, stack)
+
+        # Block field, redrawn only when blocks are destroyed or the grid is replaced
+        self.background = np.empty(frame_shape, dtype=np.uint8)
+        self.drawn_blocks = None
+        self.drawn_revision = -1
+        self.drawn_alive = b""
+
+        self.ball_colour = self.colour(WHITE)
+        self.paddle_colour = self.colour(BROWN)
+        self.background_colour = self.colour(BLACK)
+
+    def colour(self, colour: tuple[int, int, int]) -> int | np.ndarray:
+        return luminance(colour) if self.grayscale else np.array(colour, dtype=np.uint8)
+
+    def pixel_rect(self, x: float, y: float, width: float, height: float) -> tuple[slice, slice]:
+        # Rows and columns covered by a board-space rectangle, with at least one pixel on each axis
+        left = int(round(x * self.scale[0]))
+        top = int(round(y * self.scale[1]))
+        right = max(int(round((x + width) * self.scale[0])), left + 1)
+        bottom = max(int(round((y + height) * self.scale[1])), top + 1)
+        return slice(max(top, 0), max(bottom, 0)), slice(max(left, 0), max(right, 0))
+
+    def update_background(self, board: Board):
+        blocks = board.blocks
+        if blocks is not self.drawn_blocks or blocks.revision != self.drawn_revision:
+            self.background[...] = self.background_colour
+            for block in blocks:
+                self.background[self.pixel_rect(block.position.x, block.position.y, block.size, block.size)] = self.colour(block.colour)
+        elif blocks.count != self.drawn_alive.count(1):
+            for index, (alive, drawn) in enumerate(zip(blocks.alive, self.drawn_alive)):
+                if alive != drawn:
+                    block = blocks.blocks[index]
+                    self.background[self.pixel_rect(block.position.x, block.position.y, block.size, block.size)] = self.background_colour
+        else:
+            return
+        self.drawn_blocks = blocks
+        self.drawn_revision = blocks.revision
+        self.drawn_alive = bytes(blocks.alive)
+
+    def draw_ball(self, frame: np.ndarray, x: float, y: float, radius: float):
+        centre_x = x * self.scale[0]
+        centre_y = y * self.scale[1]
+        radius_x = max(radius * self.scale[0], 0.5)
+        radius_y = max(radius * self.scale[1], 0.5)
+
+        left = max(int(centre_x - radius_x), 0)
+        right = min(int(centre_x + radius_x) + 1, frame.shape[1])
+        top = max(int(centre_y - radius_y), 0)
+        bottom = min(int(centre_y + radius_y) + 1, frame.shape[0])
+        if left >= right or top >= bottom:
+            return
+        # Pixels whose centres fall inside the (scaled) circle
+        columns = (np.arange(left, right) + 0.5 - centre_x) / radius_x
+        rows = (np.arange(top, bottom) + 0.5 - centre_y) / radius_y
+        inside = rows[:, None] ** 2 + columns[None, :] ** 2 <= 1.0
+        if not inside.any():
+            # Tiny balls still cover the pixel under their centre
+            inside[min(max(int(centre_y) - top, 0), bottom - top - 1), min(max(int(centre_x) - left, 0), right - left - 1)] = True
+        frame[top:bottom, left:right][inside] = self.ball_colour
+
+    def render(self, board: Board, out: np.ndarray | None = None) -> np.ndarray:
+        # Draws the board into `out`, or into the next slot of the frame stack when `out` is None
+        self.update_background(board)
+        frame = self.stack.next_slot() if out is None else out
+        np.copyto(frame, self.background)
+
+        paddle = board.paddle
+        frame[self.pixel_rect(paddle.position.x, paddle.position.y, paddle.size[0], paddle.size[1])] = self.paddle_colour
+        for x, y in board.ball_positions():
+            self.draw_ball(frame, x, y, board.ball.radius)
+
+        if out is None:
+            self.stack.advance()
+        return frame
+
+    def reset(self, board: Board) -> np.ndarray:
+        # Fills the whole stack with the current frame, e.g. at the start of an episode
+        frame = self.render(board)
+        self.stack.fill(frame)
+        return self.stacked()
+
+    def stacked(self, out: np.ndarray | None = None) -> np.ndarray:
+        return self.stack.stacked(out)